@@ -0,0 +1,291 @@
+"""Cohort analytics over the attempt log.
+
+Attempts are decoded once into columns (student code, timestamp, topic,
+difficulty, correct) and every aggregate is a vectorised group-by over
+those columns. Nothing needs the whole history in memory: CohortStats
+consumes the log chunk by chunk and only keeps per-(student, topic)
+counters, and export_columns writes the columns to raw files that
+open_columns maps back with np.memmap, so cohorts larger than RAM are read
+straight from disk.
+
+Time to mastery is measured from a student's first attempt at a topic to the
+attempt that brings their correct answers on it to `mastery_correct`.
+
+Requires numpy. Run with:  python its_analytics.py --db progress.db
+"""
+import argparse
+import itertools
+import json
+import os
+
+import numpy as np
+
+from its_engine import DIFFICULTIES, SHAPES, TOPICS
+from its_store import DEFAULT_PATH, ProgressStore
+
+CHUNK_SIZE = 1 << 20
+
+# Column name -> dtype; also the file name (plus .bin) under export_columns
+COLUMNS = {'student': np.int32, 'ts': np.float64, 'topic': np.int8,
+           'difficulty': np.int8, 'correct': np.int8}
+
+TOPIC_CODES = {topic: code for code, topic in enumerate(TOPICS)}
+DIFFICULTY_CODES = {difficulty: code for code, difficulty in enumerate(DIFFICULTIES)}
+
+
+def encode_rows(rows, students):
+    """Turn iter_attempts rows into a dict of column arrays.
+
+    `students` maps student_id -> integer code and is extended with any new
+    ids, so codes stay stable across chunks.
+    """
+    student_ids, ts, _subjects, topics, difficulties, correct = zip(*rows)
+    n = len(rows)
+    return {
+        'student': np.fromiter((students.setdefault(s, len(students)) for s in student_ids),
+                               np.int32, n),
+        'ts': np.fromiter(ts, np.float64, n),
+        'topic': np.fromiter(map(TOPIC_CODES.__getitem__, topics), np.int8, n),
+        'difficulty': np.fromiter(map(DIFFICULTY_CODES.__getitem__, difficulties), np.int8, n),
+        'correct': np.fromiter(correct, np.int8, n),
+    }
+
+
+def iter_store_chunks(store, students, chunk_size=CHUNK_SIZE):
+    """Stream a ProgressStore's attempt log as column chunks, in log order"""
+    rows = store.iter_attempts(batch_size=min(chunk_size, 10000))
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        yield encode_rows(chunk, students)
+
+
+def export_columns(store, directory, chunk_size=CHUNK_SIZE):
+    """Write the attempt log as raw column files for open_columns.
+
+    Returns the number of attempts written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    students = {}
+    files = {name: open(os.path.join(directory, f'{name}.bin'), 'wb') for name in COLUMNS}
+    count = 0
+    try:
+        for chunk in iter_store_chunks(store, students, chunk_size):
+            for name, f in files.items():
+                chunk[name].tofile(f)
+            count += len(chunk['ts'])
+    finally:
+        for f in files.values():
+            f.close()
+
+    # Codes are assigned in first-seen order, so the list index is the code
+    with open(os.path.join(directory, 'students.json'), 'w', encoding='utf-8') as f:
+        json.dump(list(students), f)
+    return count
+
+
+def open_columns(directory):
+    """Memory-map exported columns; returns (columns, student_ids)"""
+    columns = {}
+    for name, dtype in COLUMNS.items():
+        path = os.path.join(directory, f'{name}.bin')
+        if os.path.getsize(path) == 0:
+            columns[name] = np.empty(0, dtype)   # mmap refuses empty files
+        else:
+            columns[name] = np.memmap(path, dtype=dtype, mode='r')
+    with open(os.path.join(directory, 'students.json'), encoding='utf-8') as f:
+        student_ids = json.load(f)
+    return columns, student_ids
+
+
+def iter_column_chunks(columns, chunk_size=CHUNK_SIZE):
+    """Slice column arrays (e.g. from open_columns) into chunks"""
+    n = len(columns['ts'])
+    for start in range(0, n, chunk_size):
+        yield {name: np.asarray(values[start:start + chunk_size])
+               for name, values in columns.items()}
+
+
+class CohortStats:
+    """Streaming accumulator for cohort aggregates.
+
+    Feed it column chunks in log order with update(); state is a few
+    counters per (student, topic), independent of the log length.
+    """
+
+    def __init__(self, mastery_correct=5):
+        self.mastery_correct = mastery_correct
+        self.attempts = 0
+        self.by_difficulty = np.zeros((len(TOPICS), len(DIFFICULTIES)), np.int64)
+        self._allocate(0)
+
+    def _allocate(self, capacity):
+        shape = (capacity, len(TOPICS))
+        fields = {
+            'correct': np.zeros(shape, np.int64),
+            'total': np.zeros(shape, np.int64),
+            'first_ts': np.full(shape, np.nan),
+            'mastered_ts': np.full(shape, np.nan),
+            'mastered_attempts': np.zeros(shape, np.int64),
+        }
+        for name, array in fields.items():
+            old = getattr(self, name, None)
+            if old is not None:
+                array[:len(old)] = old
+            setattr(self, name, array)
+
+    @property
+    def students(self):
+        return len(self.total)
+
+    def update(self, chunk):
+        student = chunk['student']
+        if len(student) == 0:
+            return
+        topic = chunk['topic'].astype(np.int64)
+        n_topics = len(TOPICS)
+
+        self.attempts += len(student)
+        self.by_difficulty += np.bincount(
+            topic * len(DIFFICULTIES) + chunk['difficulty'],
+            minlength=self.by_difficulty.size).reshape(self.by_difficulty.shape)
+
+        needed = int(student.max()) + 1
+        if needed > len(self.total):
+            self._allocate(max(needed, 2 * len(self.total)))
+
+        # Group rows by (student, topic); a stable sort keeps log order inside a group
+        key = student.astype(np.int64) * n_topics + topic
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+        correct = chunk['correct'][order].astype(np.int64)
+        ts = chunk['ts'][order]
+
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        group = np.cumsum(np.r_[True, key[1:] != key[:-1]]) - 1
+        groups = key[starts]
+
+        correct_flat = self.correct.reshape(-1)
+        total_flat = self.total.reshape(-1)
+        first_flat = self.first_ts.reshape(-1)
+        mastered_ts_flat = self.mastered_ts.reshape(-1)
+        mastered_attempts_flat = self.mastered_attempts.reshape(-1)
+
+        # Running correct count and attempt number of every row within its group
+        running = np.cumsum(correct)
+        running_correct = correct_flat[groups][group] + running - (running - correct)[starts][group]
+        attempt_number = total_flat[groups][group] + np.arange(len(key)) - starts[group] + 1
+
+        new = np.isnan(first_flat[groups])
+        first_flat[groups[new]] = ts[starts[new]]
+
+        # The count rises by at most one per row, so this fires once per group ever
+        mastered = (running_correct == self.mastery_correct) & (correct == 1)
+        mastered_ts_flat[key[mastered]] = ts[mastered]
+        mastered_attempts_flat[key[mastered]] = attempt_number[mastered]
+
+        correct_flat[groups] += np.add.reduceat(correct, starts)
+        total_flat[groups] += np.diff(np.r_[starts, len(key)])
+
+    def topic_success_rates(self):
+        """topic -> {'attempts', 'correct', 'rate'} across the cohort"""
+        correct = self.correct.sum(axis=0)
+        total = self.total.sum(axis=0)
+        return {topic: {'attempts': int(total[i]), 'correct': int(correct[i]),
+                        'rate': float(correct[i] / total[i]) if total[i] else 0.0}
+                for i, topic in enumerate(TOPICS)}
+
+    def difficulty_distribution(self):
+        """topic -> {difficulty: attempts}"""
+        return {topic: dict(zip(DIFFICULTIES, map(int, self.by_difficulty[i])))
+                for i, topic in enumerate(TOPICS)}
+
+    def time_to_mastery(self, percentiles=(50, 75, 90)):
+        """topic -> students who mastered it and percentiles of seconds/attempts taken"""
+        seconds = self.mastered_ts - self.first_ts
+        result = {}
+        for i, topic in enumerate(TOPICS):
+            done = ~np.isnan(seconds[:, i])
+            entry = {'students': int((self.total[:, i] > 0).sum()), 'mastered': int(done.sum())}
+            if entry['mastered']:
+                entry['seconds'] = dict(zip(percentiles, np.percentile(seconds[done, i], percentiles).tolist()))
+                entry['attempts'] = dict(zip(percentiles, np.percentile(
+                    self.mastered_attempts[done, i], percentiles).tolist()))
+            result[topic] = entry
+        return result
+
+    def weakest_shapes(self, min_attempts=3):
+        """shape -> number of students for whom it has the lowest success rate.
+
+        Only shapes a student attempted at least `min_attempts` times count;
+        students with no such shape are left out.
+        """
+        shapes = [TOPIC_CODES[shape] for shape in SHAPES]
+        total = self.total[:, shapes]
+        eligible = total >= min_attempts
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.where(eligible, self.correct[:, shapes] / total, np.inf)
+        has_any = eligible.any(axis=1)
+        weakest = np.argmin(rates[has_any], axis=1)
+        counts = np.bincount(weakest, minlength=len(SHAPES))
+        return dict(zip(SHAPES, map(int, counts)))
+
+    def report(self):
+        return {'attempts': self.attempts,
+                'students': int((self.total.sum(axis=1) > 0).sum()),
+                'success_rates': self.topic_success_rates(),
+                'difficulty_distribution': self.difficulty_distribution(),
+                'time_to_mastery': self.time_to_mastery(),
+                'weakest_shapes': self.weakest_shapes()}
+
+
+def analyse_chunks(chunks, mastery_correct=5):
+    stats = CohortStats(mastery_correct)
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+def analyse_store(store, chunk_size=CHUNK_SIZE, mastery_correct=5):
+    """CohortStats over a ProgressStore, streamed in chunks; returns (stats, student_ids)"""
+    students = {}
+    stats = analyse_chunks(iter_store_chunks(store, students, chunk_size), mastery_correct)
+    return stats, list(students)
+
+
+def analyse_columns(directory, chunk_size=CHUNK_SIZE, mastery_correct=5):
+    """CohortStats over files from export_columns; returns (stats, student_ids)"""
+    columns, student_ids = open_columns(directory)
+    return analyse_chunks(iter_column_chunks(columns, chunk_size), mastery_correct), student_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cohort analytics over tutoring attempt logs")
+    parser.add_argument('--db', default=DEFAULT_PATH, help="SQLite progress database")
+    parser.add_argument('--columns', help="Read (or with --export, write) column files in this directory")
+    parser.add_argument('--export', action='store_true', help="Export --db to --columns first")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--mastery', type=int, default=5,
+                        help="Correct answers on a topic that count as mastery")
+    args = parser.parse_args()
+
+    if args.columns and not args.export:
+        stats, _ = analyse_columns(args.columns, args.chunk_size, args.mastery)
+    else:
+        store = ProgressStore(args.db)
+        try:
+            if args.export:
+                if not args.columns:
+                    parser.error("--export needs --columns")
+                export_columns(store, args.columns, args.chunk_size)
+                stats, _ = analyse_columns(args.columns, args.chunk_size, args.mastery)
+            else:
+                stats, _ = analyse_store(store, args.chunk_size, args.mastery)
+        finally:
+            store.close()
+    print(json.dumps(stats.report(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
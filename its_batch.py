@@ -0,0 +1,200 @@
+"""Vectorised batch generation for practice banks and load-test fixtures.
+
+The scalar generators in its_engine build one problem at a time. The
+functions here draw every dimension and answer for N problems in a single
+NumPy pass and keep them as columns; text is only rendered when asked for.
+"""
+import numpy as np
+
+from its_engine import GOLDEN64, GEOMETRY_RANGES, MASK64, mix64, problem_text, quadratic_catalogue
+
+
+def _geometry_areas(shape, dims):
+    if shape == 'triangle':
+        return np.round(0.5 * dims['base'] * dims['height'], 2)
+    elif shape == 'square':
+        return (dims['side'] * dims['side']).astype(np.float64)
+    elif shape == 'rectangle':
+        return (dims['length'] * dims['width']).astype(np.float64)
+    elif shape == 'circle':
+        radius = dims['radius'].astype(np.float64)
+        return np.round(np.pi * radius * radius, 2)
+    raise ValueError(f"Unknown shape: {shape}")
+
+
+class GeometryBatch:
+    """N problems of one shape and difficulty stored as column arrays"""
+
+    def __init__(self, shape, difficulty, dims, answers):
+        self.shape = shape
+        self.difficulty = difficulty
+        self.dims = dims          # dimension name -> int32 array
+        self.answers = answers    # float64 array of rounded areas
+
+    def __len__(self):
+        return len(self.answers)
+
+    def problem(self, i):
+        """The i-th problem as the same (problem, answer) pair its_engine returns"""
+        problem = {"type": self.shape, "difficulty": self.difficulty}
+        for name, values in self.dims.items():
+            problem[name] = int(values[i])
+        answer = float(self.answers[i])
+        if self.shape in ('square', 'rectangle'):
+            answer = int(answer)
+        return problem, answer
+
+    def text(self, i):
+        return problem_text(self.problem(i)[0])
+
+    def texts(self):
+        """Render problem statements lazily, one at a time"""
+        for i in range(len(self)):
+            yield self.text(i)
+
+
+def _mix64(x):
+    """its_engine.mix64 over a uint64 array, wrapping like the masked original"""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def counter_randints(seed, start, n, bounds):
+    """One int array per (low, high) in `bounds`: row i holds the values of
+    successive CounterRandom(seed, start + i).randint(low, high) calls.
+
+    The keys, counters and getrandbits-with-rejection mapping are the same
+    as in its_engine, so the rows equal the scalar draws of problem_code_at.
+    Rejected draws are redrawn only for the rows that need them.
+    """
+    streams = np.arange(start, start + n, dtype=np.uint64)
+    keys = _mix64(np.uint64(mix64(seed & MASK64)) ^ streams)
+    positions = np.zeros(n, dtype=np.uint64)
+    columns = []
+    for low, high in bounds:
+        size = high - low + 1
+        shift = np.uint64(64 - size.bit_length())
+        values = np.empty(n, dtype=np.int64)
+        pending = np.arange(n)
+        while pending.size:
+            positions[pending] += np.uint64(1)
+            drawn = _mix64(keys[pending] + positions[pending] * np.uint64(GOLDEN64)) >> shift
+            accepted = drawn < np.uint64(size)
+            values[pending[accepted]] = drawn[accepted].astype(np.int64)
+            pending = pending[~accepted]
+        columns.append((low + values).astype(np.int32))
+    return columns
+
+
+def generate_geometry_batch(shape, difficulty, n, rng=None, seed=None, start=0):
+    """Draw n problems for one shape and difficulty in one vectorised pass.
+
+    With a `seed`, problem i of the batch is problem_code_at(seed, start + i,
+    shape, difficulty) (without an item table loaded): it depends only on
+    (seed, start + i), so batches from different workers concatenate to the
+    same set as one big batch or its_streams. Otherwise dimensions come from `rng`, a NumPy Generator.
+    """
+    ranges = GEOMETRY_RANGES[shape][difficulty]
+    dims = {}
+    if seed is not None:
+        dims = dict(zip(ranges, counter_randints(seed, start, n, ranges.values())))
+    else:
+        if rng is None:
+            rng = np.random.default_rng()
+        for name, (low, high) in ranges.items():
+            dims[name] = rng.integers(low, high, size=n, endpoint=True, dtype=np.int32)
+
+    return GeometryBatch(shape, difficulty, dims, _geometry_areas(shape, dims))
+
+
+def solve_quadratic_batch(a, b, c, decimals=2):
+    """Solve many ax² + bx + c = 0 at once.
+
+    Returns (roots, root_count, real) where roots is an (n, 2) float array
+    sorted ascending and padded with NaN, root_count is 0, 1 or 2 per row
+    (matching the length of solve_quadratic's list) and real marks rows
+    with a non-negative discriminant. Roots are rounded to `decimals`
+    places like solve_quadratic; pass None to keep full precision.
+
+    The larger-magnitude root comes from q = -(b + sign(b)√D) / 2 and the
+    other from c / q, which avoids the cancellation the textbook formula
+    suffers when b² dominates 4ac.
+    """
+    a = np.asarray(a)
+    b = np.asarray(b)
+    c = np.asarray(c)
+
+    # Integer coefficients keep the discriminant exact in int64
+    if all(np.issubdtype(x.dtype, np.integer) for x in (a, b, c)):
+        a, b, c = (x.astype(np.int64) for x in (a, b, c))
+    discriminant = b*b - 4*a*c
+    real = discriminant >= 0
+
+    af = a.astype(np.float64)
+    bf = b.astype(np.float64)
+    cf = c.astype(np.float64)
+    sqrt_disc = np.sqrt(np.where(real, discriminant, 0).astype(np.float64))
+    q = -0.5 * (bf + np.copysign(sqrt_disc, bf))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x1 = q / af
+        # q is only zero when b = c = 0, where both roots are zero
+        x2 = np.where(q != 0, cf / np.where(q != 0, q, 1), x1)
+
+    roots = np.sort(np.stack([x1, x2], axis=-1), axis=-1)
+    if decimals is not None:
+        roots = np.round(roots, decimals)
+
+    root_count = np.where(real, np.where(discriminant == 0, 1, 2), 0).astype(np.int8)
+    roots[root_count < 2, 1] = np.nan
+    roots[root_count == 0, 0] = np.nan
+    return roots, root_count, real
+
+
+def pack_solutions(rows):
+    """Pack root lists (as from solve_quadratic or parse_solutions) into arrays.
+
+    Returns (values, counts) in the layout solve_quadratic_batch uses. None
+    packs as zero roots; lists longer than two keep their true count so they
+    never match a key.
+    """
+    n = len(rows)
+    values = np.full((n, 2), np.nan)
+    counts = np.zeros(n, dtype=np.int8)
+    for i, row in enumerate(rows):
+        if row is None:
+            continue
+        counts[i] = min(len(row), 127)
+        values[i, :min(len(row), 2)] = row[:2]
+    return values, counts
+
+
+def check_quadratic_batch(submitted, submitted_count, roots, root_count, decimals=2):
+    """Grade many submitted root sets in one call.
+
+    Applies the same rule as TutoringEngine.check_algebra_answer: the
+    submission, rounded to `decimals` places and sorted, must equal the key
+    exactly. Returns a boolean array, True where the submission is correct.
+    """
+    submitted = np.asarray(submitted, dtype=np.float64)
+    if decimals is not None:
+        submitted = np.round(submitted, decimals)
+    submitted = np.sort(submitted, axis=-1)  # NaN padding sorts last
+
+    same = (submitted == roots) | (np.isnan(submitted) & np.isnan(roots))
+    return (np.asarray(submitted_count) == root_count) & same.all(axis=-1)
+
+
+def catalogue_arrays(difficulty):
+    """NumPy arrays over a QuadraticCatalogue, usable as an answer key.
+
+    Returns (a, b, c, roots, root_count). The coefficient and count arrays
+    are zero-copy views; roots is an (n, 2) copy in the same layout as
+    solve_quadratic_batch, with unused slots set to NaN.
+    """
+    catalogue = quadratic_catalogue(difficulty)
+    a, b, c, root_count = (np.frombuffer(x, dtype=np.int8) for x in
+                           (catalogue.a, catalogue.b, catalogue.c, catalogue.root_count))
+    roots = np.frombuffer(catalogue.roots, dtype=np.float64).reshape(-1, 2).copy()
+    roots[root_count < 2, 1] = np.nan
+    return a, b, c, roots, root_count
@@ -0,0 +1,318 @@
+"""Headless benchmarks for the tutoring engine.
+
+Every benchmark is set up with a fixed seed, timed one call at a time, and
+reported as throughput plus latency percentiles. Results can be saved as
+JSON and compared with a stored baseline; any benchmark whose median latency
+is more than `--tolerance` slower than the baseline is a regression and the
+run exits non-zero. Each round of a benchmark is preceded by a short fixed
+pure-Python calibration workload and comparisons use latency relative to
+it, so a machine that is busier or throttled at that moment is not
+reported as a regression.
+
+    python its_bench.py                     # run all, compare with bench_baseline.json
+    python its_bench.py -k quadratic        # only names containing 'quadratic'
+    python its_bench.py --output run.json   # also save this run
+    python its_bench.py --save-baseline     # make this run the new baseline
+
+Baselines are machine specific; regenerate one before comparing on new hardware.
+"""
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from its_engine import (ALGEBRA_GENERATORS, DIFFICULTIES, GEOMETRY_GENERATORS, SHAPES, TOPICS,
+                        TutoringEngine, parse_solutions, quadratic_catalogue, solve_quadratic)
+import its_templates
+
+SEED = 7032
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+TOLERANCE = 0.25
+HISTORY_SIZES = [10, 1000, 100000]
+
+# name -> setup(rng) returning the zero-argument callable to time
+BENCHMARKS = {}
+
+
+def bench_calibration(rng):
+    # Sorting, formatting and dict building, independent of the engine
+    values = [rng.random() for _ in range(64)]
+    return lambda: (sorted(values), f'{values[0]:.2f}, {values[1]:.2f}',
+                    {i: value for i, value in enumerate(values[:16])})
+
+
+
+def _geometry_generator(generate, difficulty):
+    return lambda rng: lambda: generate(difficulty, rng)
+
+
+def _algebra_generator(generate):
+    return lambda rng: lambda: generate(rng)
+
+
+def _engine_geometry(difficulty):
+    def setup(rng):
+        engine = TutoringEngine(rng=rng)
+        engine.set_difficulty(difficulty)
+        shapes = itertools.cycle(SHAPES)
+        return lambda: engine.generate_geometry_problem(next(shapes))
+    return setup
+
+
+def _engine_algebra(difficulty):
+    def setup(rng):
+        engine = TutoringEngine(rng=rng)
+        return lambda: engine.generate_algebra_problem(difficulty)
+    return setup
+
+
+for difficulty in DIFFICULTIES:
+    for shape in SHAPES:
+        BENCHMARKS[f'generate_{shape}_problem[{difficulty}]'] = _geometry_generator(
+            GEOMETRY_GENERATORS[shape], difficulty)
+    generate = ALGEBRA_GENERATORS[difficulty]
+    BENCHMARKS[f'{generate.__name__}[{difficulty}]'] = _algebra_generator(generate)
+    BENCHMARKS[f'engine.generate_geometry_problem[{difficulty}]'] = _engine_geometry(difficulty)
+    BENCHMARKS[f'engine.generate_algebra_problem[{difficulty}]'] = _engine_algebra(difficulty)
+
+
+def _coefficients(rng):
+    """Every catalogue equation, shuffled"""
+    coefficients = []
+    for difficulty in DIFFICULTIES:
+        catalogue = quadratic_catalogue(difficulty)
+        coefficients.extend(zip(catalogue.a, catalogue.b, catalogue.c))
+    rng.shuffle(coefficients)
+    return coefficients
+
+
+def _answers(rng, count=1000):
+    """Typed answers to catalogue problems, about half of them wrong"""
+    answers = []
+    for a, b, c in _coefficients(rng)[:count]:
+        roots = solve_quadratic(a, b, c) or [0.0]
+        if rng.random() < 0.5:
+            roots = [root + rng.choice([-1, 1]) for root in roots]
+        answers.append(', '.join(f'{root:g}' for root in roots))
+    return answers
+
+
+def bench_solve_quadratic(rng):
+    coefficients = itertools.cycle(_coefficients(rng))
+    return lambda: solve_quadratic(*next(coefficients))
+
+
+def bench_parse_solutions(rng):
+    answers = itertools.cycle(_answers(rng))
+    return lambda: parse_solutions(next(answers))
+
+
+def bench_check_algebra_answer(rng):
+    engine = TutoringEngine(rng=rng)
+    engine.generate_algebra_problem('intermediate')
+    answers = itertools.cycle(_answers(rng))
+    return lambda: engine.check_algebra_answer(next(answers))
+
+
+def _explanation(subject, cached):
+    def setup(rng):
+        engine = TutoringEngine(rng=rng)
+        if subject == 'geometry':
+            engine.generate_geometry_problem('circle')
+            explain = engine.get_geometry_explanation
+        else:
+            engine.generate_algebra_problem('intermediate')
+            explain = engine.get_algebra_explanation
+        if cached:
+            return explain
+
+        def uncached():
+            its_templates.cache_clear()
+            return explain()
+        return uncached
+    return setup
+
+
+BENCHMARKS['solve_quadratic'] = bench_solve_quadratic
+BENCHMARKS['parse_solutions'] = bench_parse_solutions
+BENCHMARKS['check_algebra_answer'] = bench_check_algebra_answer
+for subject in ('geometry', 'algebra'):
+    BENCHMARKS[f'get_{subject}_explanation[uncached]'] = _explanation(subject, False)
+    BENCHMARKS[f'get_{subject}_explanation[cached]'] = _explanation(subject, True)
+
+
+def engine_with_history(attempts, rng):
+    """An engine whose student has made `attempts` random attempts"""
+    engine = TutoringEngine(rng=rng)
+    for _ in range(attempts):
+        topic = rng.choice(TOPICS)
+        subject = 'geometry' if topic in SHAPES else 'algebra'
+        engine.record_attempt(subject, topic, rng.random() < 0.7)
+    engine.set_difficulty(rng.choice(DIFFICULTIES))
+    return engine
+
+
+def _progress_report(attempts, cached):
+    def setup(rng):
+        engine = engine_with_history(attempts, rng)
+        # The GUI's update_progress_display shows progress_report(), which only
+        # re-renders after a new attempt
+        return engine.progress_report if cached else engine.render_progress_report
+    return setup
+
+
+for attempts in HISTORY_SIZES:
+    BENCHMARKS[f'render_progress_report[{attempts}]'] = _progress_report(attempts, False)
+    BENCHMARKS[f'progress_report[{attempts}]'] = _progress_report(attempts, True)
+
+
+def _percentile(timings, percent):
+    return timings[min(len(timings) - 1, int(len(timings) * percent / 100))]
+
+
+def _time_calls(call, samples):
+    clock = time.perf_counter_ns
+    timings = []
+    for _ in range(samples):
+        start = clock()
+        call()
+        timings.append(clock() - start)
+    timings.sort()
+    return timings
+
+
+def run_benchmark(setup, samples=2000, warmup=200, seed=SEED, rounds=7):
+    """Time `samples` calls one by one; latencies are in microseconds.
+
+    The calls are repeated for `rounds` rounds, each right after timing the
+    calibration workload. The round with the lowest median is reported along
+    with the lowest calibration median, which filters out interference and
+    frequency changes on the rest of the machine.
+    """
+    call = setup(random.Random(seed))
+    calibrate = bench_calibration(random.Random(seed))
+    for _ in range(warmup):
+        call()
+        calibrate()
+
+    best = calibration = None
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            median = _percentile(_time_calls(calibrate, max(1, samples // 4)), 50)
+            if calibration is None or median < calibration:
+                calibration = median
+            timings = _time_calls(call, samples)
+            if best is None or _percentile(timings, 50) < _percentile(best, 50):
+                best = timings
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    timings = best
+    total = sum(timings)
+    return {
+        'samples': samples,
+        'ops_per_sec': samples / (total / 1e9) if total else float('inf'),
+        'mean_us': total / samples / 1000,
+        'p50_us': _percentile(timings, 50) / 1000,
+        'p90_us': _percentile(timings, 90) / 1000,
+        'p99_us': _percentile(timings, 99) / 1000,
+        'calibration_us': calibration / 1000,
+    }
+
+
+def run_all(pattern=None, samples=2000, seed=SEED, rounds=7, verbose=True):
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        results[name] = result = run_benchmark(setup, samples, seed=seed, rounds=rounds)
+        if verbose:
+            print(f"{name:48} {result['ops_per_sec']:>14,.0f} ops/s"
+                  f"  p50 {result['p50_us']:9.2f}us  p90 {result['p90_us']:9.2f}us"
+                  f"  p99 {result['p99_us']:9.2f}us")
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """(name, expected p50, p50) for every benchmark slower than the baseline allows.
+
+    The expected p50 is the baseline's, scaled by how this run's calibration
+    compares with the baseline's calibration for the same benchmark.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        expected = reference['p50_us'] * result['calibration_us'] / reference['calibration_us']
+        if result['p50_us'] > expected * (1 + tolerance):
+            regressions.append((name, expected, result['p50_us']))
+    return regressions
+
+
+def save_results(path, results, seed=SEED):
+    document = {
+        'meta': {'python': platform.python_version(), 'machine': platform.machine(),
+                 'seed': seed, 'created': time.strftime('%Y-%m-%d %H:%M:%S')},
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tutoring engine")
+    parser.add_argument('-k', dest='pattern', help="Only run benchmarks whose name contains this")
+    parser.add_argument('--samples', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=7, help="Rounds per benchmark; the fastest counts")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--output', help="Write this run's results to a JSON file")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Write this run to --baseline instead of comparing")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="Allowed slowdown of median latency, as a fraction")
+    args = parser.parse_args()
+
+    results = run_all(args.pattern, args.samples, args.seed, args.rounds)
+    if args.output:
+        save_results(args.output, results, args.seed)
+
+    if args.save_baseline:
+        if args.pattern and os.path.exists(args.baseline):
+            # Keep the benchmarks this run skipped
+            results = {**load_results(args.baseline), **results}
+        save_results(args.baseline, results, args.seed)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    baseline = load_results(args.baseline)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} REGRESSION(S) against {args.baseline}:")
+        for name, before, after in regressions:
+            print(f"  {name}: p50 {before:.2f}us -> {after:.2f}us ({after / before - 1:+.0%})")
+        sys.exit(1)
+    print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
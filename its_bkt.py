@@ -0,0 +1,214 @@
+"""Fit Bayesian Knowledge Tracing parameters from the attempt log.
+
+Each skill (a shape, or quadratic equations) gets its own (init, transit,
+slip, guess) parameters, estimated by expectation-maximisation over the
+attempt sequences of every student at once. A sequence is one student's
+attempts at one skill and difficulty, in log order, matching the per
+difficulty mastery the engine tracks. Sequences are packed into a padded
+(sequences x steps) matrix and the forward-backward passes are vectorised
+across all of them, looping in Python only over time steps.
+
+Sequences are cut at `max_length` attempts: BKT's learning happens early
+and the tail adds cost but little information. Slip and guess are capped
+at 0.5 so "known" keeps meaning "more likely to answer correctly".
+
+Requires numpy. Run with:
+
+    python its_bkt.py --db progress.db -o bkt_params.json
+    python its_system.py   # with ITS_BKT_PARAMS=bkt_params.json
+"""
+import argparse
+import json
+
+import numpy as np
+
+from its_analytics import CHUNK_SIZE, TOPIC_CODES, iter_store_chunks, open_columns
+from its_engine import BKT_FIELDS, BKT_PARAMS, DIFFICULTIES, TOPICS
+from its_store import DEFAULT_PATH, ProgressStore
+
+MAX_LENGTH = 200
+# Matrix cells (sequences x steps) handled per vectorised pass, to bound memory
+BATCH_CELLS = 1 << 20
+EPSILON = 1e-4
+
+
+def build_sequences(columns, topic, max_length=MAX_LENGTH):
+    """(correct, mask) matrices for one skill, a row per (student, difficulty).
+
+    Rows are left-aligned and sorted longest first; mask marks real attempts.
+    """
+    select = np.flatnonzero(np.asarray(columns['topic']) == TOPIC_CODES[topic])
+    if len(select) == 0:
+        return np.zeros((0, 0), np.int8), np.zeros((0, 0), bool)
+    key = (np.asarray(columns['student'])[select].astype(np.int64) * len(DIFFICULTIES)
+           + np.asarray(columns['difficulty'])[select])
+    correct = np.asarray(columns['correct'])[select]
+
+    # A stable sort keeps log order inside each sequence
+    order = np.argsort(key, kind='stable')
+    key = key[order]
+    correct = correct[order]
+    new = np.r_[True, key[1:] != key[:-1]]
+    starts = np.flatnonzero(new)
+    row = np.cumsum(new) - 1
+    position = np.arange(len(key)) - starts[row]
+    lengths = np.minimum(np.diff(np.r_[starts, len(key)]), max_length)
+
+    # Longest first, so each batch can be trimmed to its own longest row
+    rank = np.empty(len(starts), np.int64)
+    rank[np.argsort(-lengths, kind='stable')] = np.arange(len(starts))
+    keep = position < max_length
+    obs = np.zeros((len(starts), lengths.max()), np.int8)
+    mask = np.zeros(obs.shape, bool)
+    obs[rank[row[keep]], position[keep]] = correct[keep]
+    mask[rank[row[keep]], position[keep]] = True
+    return obs, mask
+
+
+def expected_counts(obs, mask, params):
+    """E-step over a batch of sequences.
+
+    Returns (log likelihood, sufficient statistics) where the statistics are
+    numerator/denominator pairs for init, transit, guess and slip.
+    """
+    init, transit, slip, guess = params
+    n, steps = obs.shape
+    correct = obs.astype(bool)
+
+    # P(outcome | unknown), P(outcome | known); 1 past the end of a sequence
+    emit = np.empty((n, steps, 2))
+    emit[..., 0] = np.where(correct, guess, 1 - guess)
+    emit[..., 1] = np.where(correct, 1 - slip, slip)
+    emit[~mask] = 1.0
+
+    # Scaled forward pass: alpha[:, t] is P(state at t | outcomes up to t)
+    alpha = np.empty((n, steps, 2))
+    scale = np.empty((n, steps))
+    prior = np.empty((n, 2))
+    prior[:, 0] = 1 - init
+    prior[:, 1] = init
+    for t in range(steps):
+        if t:
+            prior[:, 0] = alpha[:, t - 1, 0] * (1 - transit)
+            prior[:, 1] = alpha[:, t - 1, 1] + alpha[:, t - 1, 0] * transit
+        joint = prior * emit[:, t]
+        scale[:, t] = joint.sum(axis=1)
+        alpha[:, t] = joint / scale[:, t, None]
+
+    beta = np.empty((n, steps, 2))
+    beta[:, -1] = 1.0
+    for t in range(steps - 2, -1, -1):
+        ahead = emit[:, t + 1] * beta[:, t + 1] / scale[:, t + 1, None]
+        beta[:, t, 0] = (1 - transit) * ahead[:, 0] + transit * ahead[:, 1]
+        beta[:, t, 1] = ahead[:, 1]
+
+    gamma = alpha * beta
+    unknown = gamma[..., 0]
+    known = gamma[..., 1]
+    # Expected unknown -> known transitions into each observed step
+    learned = (alpha[:, :-1, 0] * transit * emit[:, 1:, 1] * beta[:, 1:, 1] / scale[:, 1:])
+    step = mask[:, 1:]
+
+    counts = np.array([
+        known[:, 0].sum(), n,
+        learned[step].sum(), unknown[:, :-1][step].sum(),
+        unknown[correct & mask].sum(), unknown[mask].sum(),
+        known[~correct & mask].sum(), known[mask].sum(),
+    ])
+    return np.log(scale[mask]).sum(), counts
+
+
+def fit_bkt(obs, mask, params=None, max_iter=100, tol=1e-6, batch_cells=BATCH_CELLS):
+    """Fit (init, transit, slip, guess) to a skill's sequences by EM.
+
+    Returns a dict of the parameters, the final log likelihood and the
+    number of iterations, sequences and attempts used.
+    """
+    params = np.array(params if params is not None else (0.2, 0.15, 0.1, 0.2), float)
+    n = len(obs)
+    lengths = mask.sum(axis=1)
+    batches = []
+    start = 0
+    while start < n:
+        # Rows are sorted longest first; drop the all-padding columns of each batch
+        width = max(1, lengths[start])
+        stop = start + max(1, batch_cells // width)
+        batches.append((obs[start:stop, :width], mask[start:stop, :width]))
+        start = stop
+
+    previous = -np.inf
+    iteration = 0
+    loglik = 0.0
+    for iteration in range(1, max_iter + 1):
+        loglik = 0.0
+        counts = np.zeros(8)
+        for batch_obs, batch_mask in batches:
+            batch_loglik, batch_counts = expected_counts(batch_obs, batch_mask, params)
+            loglik += batch_loglik
+            counts += batch_counts
+
+        ratios = counts[0::2] / np.maximum(counts[1::2], EPSILON)
+        init, transit, guess, slip = np.clip(ratios, EPSILON, 1 - EPSILON)
+        params = np.array([init, transit, min(slip, 0.5), min(guess, 0.5)])
+        if loglik - previous < tol * abs(loglik):
+            break
+        previous = loglik
+
+    result = dict(zip(BKT_FIELDS, (round(float(p), 4) for p in params)))
+    result.update(loglik=float(loglik), iterations=iteration, sequences=int(n),
+                  attempts=int(lengths.sum()))
+    return result
+
+
+def fit_columns(columns, max_length=MAX_LENGTH, max_iter=100, tol=1e-6):
+    """Fit every skill with any attempts; returns {topic: fit_bkt result}"""
+    fitted = {}
+    for topic in TOPICS:
+        obs, mask = build_sequences(columns, topic, max_length)
+        if len(obs):
+            fitted[topic] = fit_bkt(obs, mask, BKT_PARAMS[topic], max_iter, tol)
+    return fitted
+
+
+def load_store_columns(store, chunk_size=CHUNK_SIZE):
+    """The whole attempt log of a ProgressStore as column arrays"""
+    chunks = list(iter_store_chunks(store, {}, chunk_size))
+    if not chunks:
+        return {name: np.empty(0) for name in ('student', 'topic', 'difficulty', 'correct')}
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+def save_params(path, fitted):
+    """Write fitted parameters in the form its_engine.load_bkt_params reads"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(fitted, f, indent=2)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit BKT mastery parameters from attempt logs")
+    parser.add_argument('--db', default=DEFAULT_PATH, help="SQLite progress database")
+    parser.add_argument('--columns', help="Read column files written by its_analytics --export")
+    parser.add_argument('-o', '--output', help="Write the parameters to this JSON file")
+    parser.add_argument('--max-length', type=int, default=MAX_LENGTH,
+                        help="Attempts used from each student's sequence")
+    parser.add_argument('--max-iter', type=int, default=100)
+    args = parser.parse_args()
+
+    if args.columns:
+        columns, _ = open_columns(args.columns)
+    else:
+        store = ProgressStore(args.db)
+        try:
+            columns = load_store_columns(store)
+        finally:
+            store.close()
+
+    fitted = fit_columns(columns, args.max_length, args.max_iter)
+    if args.output:
+        save_params(args.output, fitted)
+    print(json.dumps(fitted, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1397 @@
+"""Headless tutoring engine for the Geometry & Algebra ITS.
+
+Problem generation, answer checking, difficulty adaptation and progress
+accounting all live here and return plain data, so the same logic can be
+driven by the tkinter window in its_system.py, a server or a script
+without a display.
+"""
+import json
+import math
+import operator
+import random
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+
+from its_templates import HINT, STATEMENT, STEPS, render
+
+SHAPES = ['triangle', 'square', 'rectangle', 'circle']
+ALGEBRA_TOPICS = ['quadratic_equations']
+TOPICS = SHAPES + ALGEBRA_TOPICS
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+
+# Bit per topic for the covered-topics masks in StudentState
+TOPIC_BITS = {topic: 1 << i for i, topic in enumerate(TOPICS)}
+SHAPE_MASK = sum(TOPIC_BITS[shape] for shape in SHAPES)
+TOPIC_NAMES = {topic: topic.replace('_', ' ').title() for topic in TOPICS}
+# Start of each topic's per-difficulty entries in StudentState.mastery
+MASTERY_SLOTS = {topic: i * len(DIFFICULTIES) for i, topic in enumerate(TOPICS)}
+
+# Geometry answers are accepted within this absolute tolerance
+GEOMETRY_TOLERANCE = 0.01
+
+# Bayesian Knowledge Tracing parameters per skill (topic), as
+# (initial mastery, learn rate, slip, guess); its_bkt.py fits them from the
+# attempt log. Mastery is tracked separately at each difficulty.
+BKT_FIELDS = ('init', 'transit', 'slip', 'guess')
+BKT_PARAMS = {topic: (0.2, 0.15, 0.1, 0.2) for topic in TOPICS}
+# P(known) at which a difficulty counts as mastered and the next one is served
+MASTERED = 0.95
+# StudentState keeps P(known) as a uint16 in units of 1/MASTERY_SCALE
+MASTERY_SCALE = 65535
+MASTERED_UNITS = math.ceil(MASTERED * MASTERY_SCALE)
+
+# Spaced review. A wrong answer puts the topic up for review REVIEW_FIRST
+# seconds later; every review answered correctly once due multiplies the
+# interval by REVIEW_GROWTH, and past REVIEW_LAST the topic leaves the schedule.
+REVIEW_FIRST = 600.0
+REVIEW_GROWTH = 2.5
+REVIEW_LAST = 30 * 86400.0
+# Every interval a review can have, shortest first
+REVIEW_INTERVALS = tuple(REVIEW_FIRST * REVIEW_GROWTH ** step
+                         for step in range(int(math.log(REVIEW_LAST / REVIEW_FIRST,
+                                                        REVIEW_GROWTH)) + 1))
+# Start of each topic's (due time, index into REVIEW_INTERVALS) in StudentState.reviews
+REVIEW_SLOTS = {topic: 2 * i for i, topic in enumerate(TOPICS)}
+
+
+MASK64 = (1 << 64) - 1
+GOLDEN64 = 0x9E3779B97F4A7C15
+
+
+def mix64(x):
+    """SplitMix64 finaliser: a bijective scramble of a 64-bit integer"""
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASK64
+    return x ^ (x >> 31)
+
+
+def derive_seed(seed, *names):
+    """64-bit seed of a named sub-stream, e.g. derive_seed(seed, student_id)"""
+    import hashlib  # only seeded sessions need it; keeps the desktop app's start-up lean
+    digest = hashlib.blake2b(repr((seed,) + names).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class CounterRandom(random.Random):
+    """random.Random whose n-th draw is a pure function of (seed, stream, n).
+
+    There is no hidden state to share or split: CounterRandom(seed, i) can
+    be rebuilt anywhere, in any process, and yields the same draws, so
+    giving problem i its own stream i makes a problem set reproducible
+    however it is divided up.
+    """
+
+    def __init__(self, seed=0, stream=0):
+        self._key = mix64((mix64(seed & MASK64) ^ stream) & MASK64)
+        self._position = 0
+        super().__init__()
+
+    def seed(self, a=None, version=2):
+        # Draws are fixed by (seed, stream); reseeding just rewinds
+        self._position = 0
+        self.gauss_next = None
+
+    def getstate(self):
+        return self._key, self._position
+
+    def setstate(self, state):
+        self._key, self._position = state
+
+    def _next64(self):
+        # mix64 inlined: this runs for every draw
+        self._position += 1
+        x = (self._key + self._position * GOLDEN64) & MASK64
+        x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+        x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASK64
+        return x ^ (x >> 31)
+
+    def random(self):
+        return (self._next64() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k):
+        if k <= 64:
+            return self._next64() >> (64 - k)
+        words = (k + 63) // 64
+        bits = 0
+        for _ in range(words):
+            bits = (bits << 64) | self._next64()
+        return bits >> (words * 64 - k)
+
+
+def success_rate(correct, total):
+    return correct / max(1, total)
+
+
+def bkt_update(mastery, correct, params):
+    """P(known) after one more attempt: Bayes on the outcome, then the chance to learn"""
+    _init, transit, slip, guess = params
+    if correct:
+        known = mastery * (1 - slip)
+        posterior = known / (known + (1 - mastery) * guess)
+    else:
+        known = mastery * slip
+        posterior = known / (known + (1 - mastery) * (1 - guess))
+    return posterior + (1 - posterior) * transit
+
+
+def load_bkt_params(path):
+    """Use BKT parameters fitted by its_bkt.py for the topics the file covers"""
+    with open(path, encoding='utf-8') as f:
+        fitted = json.load(f)
+    for topic, params in fitted.items():
+        if topic in BKT_PARAMS:
+            BKT_PARAMS[topic] = tuple(float(params[name]) for name in BKT_FIELDS)
+
+
+def solve_quadratic(a, b, c):
+    discriminant = b*b - 4*a*c
+
+    if discriminant < 0:
+        return None  # No real solutions
+    elif discriminant == 0:
+        solution = -b / (2*a)
+        return [round(solution, 2)]
+    else:
+        sqrt_discriminant = math.sqrt(discriminant)
+        solution1 = (-b + sqrt_discriminant) / (2*a)
+        solution2 = (-b - sqrt_discriminant) / (2*a)
+        return sorted([round(solution1, 2), round(solution2, 2)])
+
+
+def format_equation(a, b, c):
+    """Render ax² + bx + c = 0 with signs folded into the operators.
+
+    A leading coefficient of 1 or -1 is written as x² or -x², so beginner and
+    intermediate equations with a = 1 read the same.
+    """
+    equation = "x² " if a == 1 else "-x² " if a == -1 else f"{a}x² "
+    if b >= 0:
+        equation += f"+ {b}x "
+    else:
+        equation += f"- {abs(b)}x "
+    if c >= 0:
+        equation += f"+ {c} = 0"
+    else:
+        equation += f"- {abs(c)} = 0"
+    return equation
+
+
+# Inclusive dimension ranges drawn by the geometry generators, by shape and
+# difficulty. Dimensions are drawn in the order listed.
+GEOMETRY_RANGES = {
+    'triangle': {
+        'beginner': {'base': (3, 10), 'height': (3, 8)},
+        'intermediate': {'base': (5, 15), 'height': (4, 12)},
+        'advanced': {'base': (8, 20), 'height': (6, 15)},
+    },
+    'square': {
+        'beginner': {'side': (3, 10)},
+        'intermediate': {'side': (5, 15)},
+        'advanced': {'side': (8, 25)},
+    },
+    'rectangle': {
+        'beginner': {'length': (4, 10), 'width': (3, 8)},
+        'intermediate': {'length': (6, 15), 'width': (4, 12)},
+        'advanced': {'length': (10, 25), 'width': (6, 18)},
+    },
+    'circle': {
+        'beginner': {'radius': (2, 8)},
+        'intermediate': {'radius': (4, 12)},
+        'advanced': {'radius': (6, 20)},
+    },
+}
+
+
+def geometry_answer(problem):
+    """Expected area for a geometry problem, rounded as the student is asked to"""
+    kind = problem['type']
+    if kind == 'triangle':
+        return round(0.5 * problem['base'] * problem['height'], 2)
+    elif kind == 'square':
+        return problem['side'] * problem['side']
+    elif kind == 'rectangle':
+        return problem['length'] * problem['width']
+    elif kind == 'circle':
+        return round(math.pi * problem['radius'] * problem['radius'], 2)
+    raise ValueError(f"Unknown shape: {kind}")
+
+
+def geometry_problem(shape, difficulty, *dimensions):
+    """Rebuild (problem, answer) from dimensions given in GEOMETRY_RANGES order"""
+    problem = {"type": shape, "difficulty": difficulty}
+    problem.update(zip(GEOMETRY_RANGES[shape][difficulty], dimensions))
+    return problem, geometry_answer(problem)
+
+
+# Geometry generators. Each returns (problem, answer) for one shape.
+
+def generate_triangle_problem(difficulty, rng=random):
+    ranges = GEOMETRY_RANGES['triangle'][difficulty]
+    base = rng.randint(*ranges['base'])
+    height = rng.randint(*ranges['height'])
+
+    problem = {"type": "triangle", "difficulty": difficulty, "base": base, "height": height}
+    return problem, geometry_answer(problem)
+
+
+def generate_square_problem(difficulty, rng=random):
+    side = rng.randint(*GEOMETRY_RANGES['square'][difficulty]['side'])
+
+    problem = {"type": "square", "difficulty": difficulty, "side": side}
+    return problem, geometry_answer(problem)
+
+
+def generate_rectangle_problem(difficulty, rng=random):
+    ranges = GEOMETRY_RANGES['rectangle'][difficulty]
+    length = rng.randint(*ranges['length'])
+    width = rng.randint(*ranges['width'])
+
+    problem = {"type": "rectangle", "difficulty": difficulty, "length": length, "width": width}
+    return problem, geometry_answer(problem)
+
+
+def generate_circle_problem(difficulty, rng=random):
+    radius = rng.randint(*GEOMETRY_RANGES['circle'][difficulty]['radius'])
+
+    problem = {"type": "circle", "difficulty": difficulty, "radius": radius}
+    return problem, geometry_answer(problem)
+
+
+GEOMETRY_GENERATORS = {
+    'triangle': generate_triangle_problem,
+    'square': generate_square_problem,
+    'rectangle': generate_rectangle_problem,
+    'circle': generate_circle_problem,
+}
+
+
+# Coefficient domains for the quadratic generators. Beginner equations are
+# built from two integer roots; the others draw a, b and c directly and only
+# keep triples with real roots.
+QUADRATIC_DOMAINS = {
+    'beginner': {'roots': (-5, 5)},
+    'intermediate': {'a': (1, 2, 3), 'b': (-10, 10), 'c': (-8, 8)},
+    'advanced': {'a': (2, 3, 4, 5), 'b': (-15, 15), 'c': (-10, 10)},
+}
+
+
+class QuadraticCatalogue:
+    """Every valid quadratic for one difficulty, with its solutions.
+
+    The coefficient domains are small and finite, so each is enumerated once
+    into compact arrays. Drawing a problem is then a single indexed lookup
+    with no rejection loop, and the arrays double as a ready answer key.
+    """
+
+    def __init__(self, difficulty):
+        self.difficulty = difficulty
+        self.a = array('b')
+        self.b = array('b')
+        self.c = array('b')
+        self.roots = array('d')        # two slots per entry, ascending
+        self.root_count = array('b')   # number of solutions the student enters
+
+        domain = QUADRATIC_DOMAINS[difficulty]
+        if difficulty == 'beginner':
+            # One entry per ordered root pair, so the draw matches picking two
+            # roots independently
+            low, high = domain['roots']
+            for root1 in range(low, high + 1):
+                for root2 in range(low, high + 1):
+                    # (x - root1)(x - root2) = x² - (root1 + root2)x + root1*root2
+                    self._add(1, -(root1 + root2), root1 * root2, sorted([root1, root2]))
+        else:
+            for a in domain['a']:
+                for b in range(domain['b'][0], domain['b'][1] + 1):
+                    for c in range(domain['c'][0], domain['c'][1] + 1):
+                        solutions = solve_quadratic(a, b, c)
+                        if solutions is not None:
+                            self._add(a, b, c, solutions)
+
+    def _add(self, a, b, c, solutions):
+        self.a.append(a)
+        self.b.append(b)
+        self.c.append(c)
+        self.roots.extend([solutions[0], solutions[-1]])
+        self.root_count.append(len(solutions))
+
+    def __len__(self):
+        return len(self.a)
+
+    def entry(self, i):
+        """The i-th quadratic as (problem, sorted solutions)"""
+        a, b, c = self.a[i], self.b[i], self.c[i]
+        solutions = self.roots[2*i:2*i + self.root_count[i]].tolist()
+        if self.difficulty == 'beginner':
+            solutions = [int(x) for x in solutions]
+
+        problem = {"type": "quadratic", "difficulty": self.difficulty,
+                   "a": a, "b": b, "c": c, "equation": format_equation(a, b, c)}
+        return problem, solutions
+
+    def draw(self, rng=random):
+        return self.entry(rng.randrange(len(self)))
+
+
+_catalogues = {}
+
+
+def quadratic_catalogue(difficulty):
+    """Catalogue for a difficulty, built on first use and then shared"""
+    catalogue = _catalogues.get(difficulty)
+    if catalogue is None:
+        catalogue = _catalogues[difficulty] = QuadraticCatalogue(difficulty)
+    return catalogue
+
+
+def quadratic_solutions(a, b, c, difficulty=None):
+    """Answer key the tutor uses for ax² + bx + c = 0 at a difficulty.
+
+    Beginner problems are built from two integer roots, so a repeated root
+    is expected twice there; otherwise this is solve_quadratic's result.
+    """
+    solutions = solve_quadratic(a, b, c)
+    if difficulty == 'beginner' and solutions is not None and len(solutions) == 1:
+        return solutions * 2
+    return solutions
+
+
+# Algebra generators. Each returns (problem, sorted solutions).
+
+def generate_simple_quadratic(rng=random):
+    # Simple factorable quadratics built from two integer roots
+    return quadratic_catalogue('beginner').draw(rng)
+
+
+def generate_intermediate_quadratic(rng=random):
+    # Quadratics with integer coefficients and real roots
+    return quadratic_catalogue('intermediate').draw(rng)
+
+
+def generate_advanced_quadratic(rng=random):
+    # Larger leading coefficients, still guaranteed real roots
+    return quadratic_catalogue('advanced').draw(rng)
+
+
+ALGEBRA_GENERATORS = {
+    'beginner': generate_simple_quadratic,
+    'intermediate': generate_intermediate_quadratic,
+    'advanced': generate_advanced_quadratic,
+}
+
+
+# Compact problem codes, as kept in StudentState and handed out by its_pool:
+# geometry is (shape, difficulty, *dimensions), algebra is
+# (difficulty, catalogue index).
+
+def draw_geometry_code(shape, difficulty, rng=random):
+    problem, _ = GEOMETRY_GENERATORS[shape](difficulty, rng)
+    return (shape, difficulty) + tuple(problem[name] for name in GEOMETRY_RANGES[shape][difficulty])
+
+
+def draw_algebra_code(difficulty, rng=random):
+    return (difficulty, rng.randrange(len(quadratic_catalogue(difficulty))))
+
+
+def draw_problem_code(topic, difficulty, rng=random):
+    """Code for a new problem; topic is a shape or 'quadratic'"""
+    if ITEM_TARGETS and (topic, difficulty) in ITEM_TARGETS:
+        return calibrated_code(topic, difficulty, rng)
+    if topic == 'quadratic':
+        return draw_algebra_code(difficulty, rng)
+    return draw_geometry_code(topic, difficulty, rng)
+
+
+def problem_code_at(seed, index, topic, difficulty):
+    """Problem `index` of the seeded stream `seed`; depends on nothing else"""
+    return draw_problem_code(topic, difficulty, CounterRandom(seed, index))
+
+
+def algebra_problem(difficulty, index):
+    """Rebuild (problem, solutions) from an algebra code"""
+    return quadratic_catalogue(difficulty).entry(index)
+
+
+def problem_from_code(code):
+    """(problem, answer) for a geometry or algebra code"""
+    if code[0] in SHAPES:
+        return geometry_problem(*code)
+    return algebra_problem(*code)
+
+
+# Item calibration. its_irt.py fits an IRT difficulty per item bucket from
+# the attempt log: a geometry bucket is the band of GEOMETRY_BUCKET_WIDTH
+# each dimension falls in, a quadratic bucket is (catalogue difficulty, a,
+# whether the roots are whole numbers). Once load_item_table has read a
+# table, problems come from the buckets whose calibrated difficulty is
+# nearest the level's target instead of from the fixed ranges. Quadratics
+# stay in their own catalogue, which fixes the form of the answer.
+
+GEOMETRY_BUCKET_WIDTH = 5
+# Widest range of each dimension over all difficulties
+GEOMETRY_SPANS = {shape: {name: (min(ranges[d][name][0] for d in DIFFICULTIES),
+                                 max(ranges[d][name][1] for d in DIFFICULTIES))
+                          for name in ranges['beginner']}
+                  for shape, ranges in GEOMETRY_RANGES.items()}
+# (topic, difficulty) -> seen bits of the buckets calibrated_code draws from
+CALIBRATED_REGIONS = {}
+# Target item difficulty (IRT b, in standard deviations of student ability)
+DIFFICULTY_TARGETS = {'beginner': -1.0, 'intermediate': 0.0, 'advanced': 1.0}
+# Buckets this much further from the target than the nearest one are drawn too
+TARGET_WINDOW = 0.25
+# (topic, difficulty) -> (ascending calibrated difficulties, their buckets)
+ITEM_TARGETS = {}
+# Bumped each time load_item_table replaces the table
+_item_table_version = 0
+
+
+def item_bucket(code):
+    """(family, bucket) an answered problem code is calibrated under"""
+    if code[0] in SHAPES:
+        return code[0], tuple(d // GEOMETRY_BUCKET_WIDTH for d in code[2:])
+    difficulty, index = code
+    catalogue = quadratic_catalogue(difficulty)
+    roots = catalogue.roots[2*index:2*index + catalogue.root_count[index]]
+    return 'quadratic', (difficulty, catalogue.a[index], int(all(r == int(r) for r in roots)))
+
+
+@lru_cache(maxsize=None)
+def quadratic_buckets(difficulty):
+    """Catalogue indices of a difficulty's quadratics, grouped by bucket"""
+    buckets = {}
+    for index in range(len(quadratic_catalogue(difficulty))):
+        buckets.setdefault(item_bucket((difficulty, index))[1], []).append(index)
+    return buckets
+
+
+def draw_bucket_code(family, bucket, difficulty, rng=random):
+    """Problem code drawn uniformly from one item bucket"""
+    if family == 'quadratic':
+        indices = quadratic_buckets(bucket[0])[bucket]
+        return (bucket[0], indices[rng.randrange(len(indices))])
+    width = GEOMETRY_BUCKET_WIDTH
+    dimensions = tuple(rng.randint(max(low, band * width), min(high, band * width + width - 1))
+                       for (low, high), band in zip(GEOMETRY_SPANS[family].values(), bucket))
+    return (family, difficulty) + dimensions
+
+
+def _drawable(family, bucket):
+    if family == 'quadratic':
+        return bucket[0] in DIFFICULTIES and bucket in quadratic_buckets(bucket[0])
+    spans = GEOMETRY_SPANS.get(family)
+    width = GEOMETRY_BUCKET_WIDTH
+    return (spans is not None and len(bucket) == len(spans)
+            and all(max(low, band * width) <= min(high, band * width + width - 1)
+                    for (low, high), band in zip(spans.values(), bucket)))
+
+
+def load_item_table(path):
+    """Draw problems by calibrated difficulty using a table written by its_irt.py"""
+    global _item_table_version
+    with open(path, encoding='utf-8') as f:
+        table = json.load(f)
+    if table['bucket_width'] != GEOMETRY_BUCKET_WIDTH:
+        raise ValueError(f"Item table uses buckets of {table['bucket_width']}, "
+                         f"expected {GEOMETRY_BUCKET_WIDTH}")
+
+    ITEM_TARGETS.clear()
+    CALIBRATED_REGIONS.clear()
+    for family, items in table['families'].items():
+        entries = sorted((b, tuple(bucket)) for b, bucket in zip(items['b'], items['buckets'])
+                         if _drawable(family, tuple(bucket)))
+        for difficulty in DIFFICULTIES:
+            chosen = [(b, bucket) for b, bucket in entries
+                      if family != 'quadratic' or bucket[0] == difficulty]
+            if chosen:
+                ITEM_TARGETS[family, difficulty] = ([b for b, _ in chosen],
+                                                    [bucket for _, bucket in chosen])
+    _item_table_version += 1
+
+
+def item_table_version():
+    """Changes whenever load_item_table replaces the table"""
+    return _item_table_version
+
+
+def calibrated_code(topic, difficulty, rng=random, target=None):
+    """Code from a bucket near `target` (default: the level's target difficulty)"""
+    difficulties, buckets = ITEM_TARGETS[topic, difficulty]
+    if target is None:
+        target = DIFFICULTY_TARGETS[difficulty]
+    low, high = target_window(difficulties, target)
+    return draw_bucket_code(topic, buckets[rng.randrange(low, high)], difficulty, rng)
+
+
+def target_window(difficulties, target):
+    """Slice of ascending calibrated difficulties that calibrated_code draws from"""
+    i = bisect_left(difficulties, target)
+    nearest = min(abs(difficulties[j] - target) for j in (i - 1, i) if 0 <= j < len(difficulties))
+    reach = nearest + TARGET_WINDOW
+    return bisect_left(difficulties, target - reach), bisect_right(difficulties, target + reach)
+
+
+# Seen-problem index. Every problem the generators can produce has a fixed
+# bit: geometry by shape and dimensions, numbered over GEOMETRY_SPANS so a
+# triangle is the same problem whichever difficulty served it, and
+# quadratics by catalogue index. The spaces are small (a few thousand bits
+# in all), so a plain bitset is exact and smaller than a Bloom filter would
+# need to be. Changing the ranges or domains renumbers the bits.
+
+# Draws tried before falling back to a scan for an unseen problem
+SEEN_TRIES = 4
+# (lowest value, number of values) of each dimension, for numbering shapes
+SEEN_RADICES = {shape: tuple((low, high - low + 1) for low, high in spans.values())
+                for shape, spans in GEOMETRY_SPANS.items()}
+
+
+@lru_cache(maxsize=None)
+def seen_layout():
+    """{shape or ('quadratic', difficulty): first bit}, plus 'bits' in total"""
+    layout = {}
+    bit = 0
+    for shape in SHAPES:
+        layout[shape] = bit
+        bit += math.prod(size for _, size in SEEN_RADICES[shape])
+    # Geometry first: a student who only does geometry needs the fewest bytes
+    for difficulty in DIFFICULTIES:
+        layout['quadratic', difficulty] = bit
+        bit += len(quadratic_catalogue(difficulty))
+    layout['bits'] = bit
+    return layout
+
+
+def seen_bit(code):
+    """Bit of a problem code in the seen index"""
+    layout = seen_layout()
+    radices = SEEN_RADICES.get(code[0])
+    if radices is None:
+        return layout['quadratic', code[0]] + code[1]
+    position = 0
+    for (low, size), dimension in zip(radices, code[2:]):
+        position = position * size + dimension - low
+    return layout[code[0]] + position
+
+
+def seen_code(topic, difficulty, bit):
+    """Problem code at a bit of the seen index; topic is a shape or 'quadratic'"""
+    if topic == 'quadratic':
+        return (difficulty, bit - seen_layout()['quadratic', difficulty])
+    position = bit - seen_layout()[topic]
+    dimensions = []
+    for low, size in reversed(SEEN_RADICES[topic]):
+        position, offset = divmod(position, size)
+        dimensions.append(low + offset)
+    return (topic, difficulty) + tuple(reversed(dimensions))
+
+
+@lru_cache(maxsize=None)
+def seen_region(topic, difficulty):
+    """Ascending bits of every problem a difficulty's generator can draw"""
+    if topic == 'quadratic':
+        start = seen_layout()['quadratic', difficulty]
+        return array('H', range(start, start + len(quadratic_catalogue(difficulty))))
+    codes = [()]
+    for low, high in GEOMETRY_RANGES[topic][difficulty].values():
+        codes = [code + (dimension,) for code in codes for dimension in range(low, high + 1)]
+    return array('H', (seen_bit((topic, difficulty) + code) for code in codes))
+
+
+def draw_region(topic, difficulty):
+    """Ascending bits of every problem draw_problem_code can give a difficulty.
+
+    With an item table loaded that is the calibrated buckets nearest the
+    level's target, not the fixed range, so a student who has seen them all
+    starts a new round of the same buckets.
+    """
+    if not ITEM_TARGETS or (topic, difficulty) not in ITEM_TARGETS:
+        return seen_region(topic, difficulty)
+    region = CALIBRATED_REGIONS.get((topic, difficulty))
+    if region is None:
+        difficulties, buckets = ITEM_TARGETS[topic, difficulty]
+        low, high = target_window(difficulties, DIFFICULTY_TARGETS[difficulty])
+        bits = set()
+        for bucket in buckets[low:high]:
+            if topic == 'quadratic':
+                start = seen_layout()['quadratic', bucket[0]]
+                bits.update(start + index for index in quadratic_buckets(bucket[0])[bucket])
+                continue
+            codes = [()]
+            width = GEOMETRY_BUCKET_WIDTH
+            for (low_value, high_value), band in zip(GEOMETRY_SPANS[topic].values(), bucket):
+                values = range(max(low_value, band * width),
+                               min(high_value, band * width + width - 1) + 1)
+                codes = [code + (value,) for code in codes for value in values]
+            bits.update(seen_bit((topic, difficulty) + code) for code in codes)
+        region = CALIBRATED_REGIONS[topic, difficulty] = array('H', sorted(bits))
+    return region
+
+
+def problem_text(problem):
+    """Problem statement shown to the student"""
+    return render(problem, STATEMENT)
+
+
+def geometry_explanation(problem, answer):
+    return render(problem, STEPS, answer)
+
+
+# Feedback, hint and steps before the student has been given a problem
+NO_PROBLEM_YET = " No problem yet. Click 'New Problem' to get one first."
+
+
+def geometry_hint(problem):
+    return render(problem, HINT)
+
+
+def algebra_explanation(problem):
+    return render(problem, STEPS)
+
+
+# Operators a typed number may use, e.g. "1/2", "-3/4" or "(1 + 2) / 3". The
+# table is keyed by ast node class, so it is only built (and ast imported)
+# for the first answer that float() cannot read
+@lru_cache(maxsize=None)
+def _answer_operators():
+    import ast
+    return {ast.Add: operator.add, ast.Sub: operator.sub,
+            ast.Mult: operator.mul, ast.Div: operator.truediv,
+            ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+ANSWER_MAX_LENGTH = 64
+
+
+def _evaluate_answer(node):
+    import ast
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, (ast.UnaryOp, ast.BinOp)):
+        apply = _answer_operators().get(type(node.op))
+        if apply is not None:
+            if isinstance(node, ast.UnaryOp):
+                return apply(_evaluate_answer(node.operand))
+            return apply(_evaluate_answer(node.left), _evaluate_answer(node.right))
+    raise ValueError("Only numbers, + - * / and brackets are allowed")
+
+
+@lru_cache(maxsize=4096)
+def parse_number(text):
+    """Parse a typed number: anything float() takes, fractions like 1/2, or
+    simple arithmetic with + - * / and brackets. Raises ValueError.
+    """
+    text = text.strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    if not text or len(text) > ANSWER_MAX_LENGTH:
+        raise ValueError(f"Not a number: {text!r}")
+    import ast
+    try:
+        return float(_evaluate_answer(ast.parse(text, mode='eval').body))
+    except (SyntaxError, ZeroDivisionError, OverflowError):
+        raise ValueError(f"Not a number: {text!r}")
+
+
+def parse_solutions(text):
+    """Parse a comma-separated list of roots into sorted 2dp floats"""
+    solutions = [round(parse_number(x), 2) for x in text.strip().split(',')]
+    solutions.sort()
+    return solutions
+
+
+def grade_geometry(user_input, correct_answer):
+    """(user_answer, correct) for a typed area; raises ValueError if it is not a number"""
+    user_answer = parse_number(user_input)
+    return user_answer, abs(user_answer - correct_answer) <= GEOMETRY_TOLERANCE
+
+
+def grade_algebra(user_input, correct_solutions):
+    """(user_solutions, correct) for typed roots; raises ValueError if they do not parse"""
+    user_solutions = parse_solutions(user_input)
+    return user_solutions, user_solutions == correct_solutions
+
+
+def rate_band(rate):
+    """Classify a success rate the way the recommendations do"""
+    if rate < 0.6:
+        return 'low'
+    elif rate > 0.8:
+        return 'high'
+    return 'ok'
+
+
+@lru_cache(maxsize=None)
+def learning_recommendations(geometry_band, algebra_band, shape_mask):
+    """Recommendation text for rate bands and a mask of covered shapes.
+
+    There are only 3 x 3 x 16 distinct inputs, so every answer is memoised.
+    """
+    recommendations = []
+
+    # Geometry recommendations
+    if geometry_band == 'low':
+        recommendations.append("• Review geometry formulas in the Help tab")
+        recommendations.append("• Practice more basic area calculations")
+    elif geometry_band == 'high':
+        recommendations.append("• Great job with geometry! Try harder problems")
+
+    # Algebra recommendations
+    if algebra_band == 'low':
+        recommendations.append("• Focus on quadratic formula steps")
+        recommendations.append("• Practice identifying coefficients a, b, c")
+    elif algebra_band == 'high':
+        recommendations.append("• Excellent algebra skills! Challenge yourself with advanced problems")
+
+    # Topic coverage recommendations
+    missing_shapes = [shape for shape in SHAPES if not shape_mask & TOPIC_BITS[shape]]
+    if missing_shapes:
+        recommendations.append(f"• Try problems with: {', '.join(missing_shapes)}")
+
+    if not recommendations:
+        recommendations.append("• Keep up the excellent work!")
+        recommendations.append("• Continue practicing to maintain your skills")
+
+    return '\n'.join(recommendations)
+
+
+class ProgressStats:
+    """Running counters, O(1) per attempt.
+
+    Each key (the two subjects, then every topic) has a correct/total pair in
+    `counts`. `version` increases on every attempt.
+    """
+
+    __slots__ = ('counts', 'version')
+
+    KEYS = ['geometry', 'algebra'] + TOPICS
+    SLOTS = {key: i for i, key in enumerate(KEYS)}
+
+    def __init__(self):
+        self.counts = array('I', [0]) * (2 * len(self.KEYS))
+        self.version = 0
+
+    def record(self, subject, topic, correct):
+        outcome = 1 if correct else 0
+        counts = self.counts
+        for slot in (self.SLOTS[subject], self.SLOTS[topic]):
+            counts[2*slot] += outcome
+            counts[2*slot + 1] += 1
+        self.version += 1
+
+    def correct(self, key):
+        return self.counts[2 * self.SLOTS[key]]
+
+    def total(self, key):
+        return self.counts[2 * self.SLOTS[key] + 1]
+
+    def rate(self, key):
+        """Lifetime success rate for a subject or topic"""
+        slot = self.SLOTS[key]
+        return success_rate(self.counts[2*slot], self.counts[2*slot + 1])
+
+    def total_attempts(self):
+        return self.counts[1] + self.counts[3]
+
+    def total_correct(self):
+        return self.counts[0] + self.counts[2]
+
+    def snapshot(self):
+        return {'counts': {key: [self.correct(key), self.total(key)] for key in self.KEYS}}
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        # Older snapshots also carry a 'recent' average per key, no longer kept
+        stats = cls()
+        for key, (correct, total) in snapshot['counts'].items():
+            slot = cls.SLOTS[key]
+            stats.counts[2*slot] = correct
+            stats.counts[2*slot + 1] = total
+        return stats
+
+
+class StudentState:
+    """Everything the tutor remembers about one student, in under a kilobyte.
+
+    Counters live in a ProgressStats and covered topics in a bitmask over
+    TOPICS. `mastery` holds the BKT estimate P(known) for every (topic,
+    difficulty) pair; a topic's current difficulty is the one after the
+    hardest it has mastered. Current problems are kept as short tuples and
+    rebuilt into dicts only when needed: geometry as (shape, difficulty,
+    *dimensions) and algebra as (difficulty, catalogue index). Problems
+    already served are bits in `seen`, which only grows as far as the
+    highest bit set. `reviews` holds each topic's review due time (whole
+    Unix seconds, 0 when not scheduled) and its interval as an index into
+    REVIEW_INTERVALS, and `next_review` the earliest due time (0 when
+    nothing is scheduled). Mastery is stored in uint16 units of
+    1/MASTERY_SCALE and reviews as uint32, plenty for probabilities and for
+    times until 2106.
+    """
+
+    __slots__ = ('stats', 'topics', 'mastery', 'reviews', 'next_review', 'geometry', 'algebra',
+                 'problems', 'seen', 'last_seen')
+
+    def __init__(self):
+        self.stats = ProgressStats()
+        self.topics = 0
+        self.mastery = array('H', [round(BKT_PARAMS[topic][0] * MASTERY_SCALE)
+                                   for topic in TOPICS for _ in DIFFICULTIES])
+        self.reviews = array('I', [0]) * (2 * len(TOPICS))
+        self.next_review = 0.0
+        self.geometry = None
+        self.algebra = None
+        # Problems generated so far; the position in a seeded session's stream
+        self.problems = 0
+        self.seen = bytearray()
+        self.last_seen = 0.0
+
+    def has_topic(self, topic):
+        return bool(self.topics & TOPIC_BITS[topic])
+
+    def topics_covered(self, subject):
+        topics = SHAPES if subject == 'geometry' else ALGEBRA_TOPICS
+        return [topic for topic in topics if self.topics & TOPIC_BITS[topic]]
+
+    def skill_level(self, topic):
+        """Index into DIFFICULTIES of the difficulty to serve for a topic"""
+        base = MASTERY_SLOTS[topic]
+        top = len(DIFFICULTIES) - 1
+        for level in range(top, -1, -1):
+            if self.mastery[base + level] >= MASTERED_UNITS:
+                return min(level + 1, top)
+        return 0
+
+    def level(self):
+        """Overall level: the lowest reached on any topic attempted so far"""
+        levels = [self.skill_level(topic) for topic in TOPICS if self.topics & TOPIC_BITS[topic]]
+        return min(levels) if levels else 0
+
+    def update_mastery(self, topic, difficulty, correct):
+        """BKT update for one attempt; returns True if the topic's level changed"""
+        level = self.skill_level(topic)
+        slot = MASTERY_SLOTS[topic] + DIFFICULTIES.index(difficulty)
+        mastery = bkt_update(self.mastery[slot] / MASTERY_SCALE, correct, BKT_PARAMS[topic])
+        self.mastery[slot] = round(mastery * MASTERY_SCALE)
+        return self.skill_level(topic) != level
+
+    def set_level(self, topic, level):
+        """Place a topic at a level: easier difficulties mastered, harder ones not"""
+        base = MASTERY_SLOTS[topic]
+        init = round(BKT_PARAMS[topic][0] * MASTERY_SCALE)
+        for i in range(len(DIFFICULTIES)):
+            if i < level:
+                self.mastery[base + i] = max(self.mastery[base + i], MASTERED_UNITS)
+            elif self.mastery[base + i] >= MASTERED_UNITS:
+                self.mastery[base + i] = init
+
+    def schedule_review(self, topic, correct, now):
+        """Move a topic's review after an attempt; returns its due time (0 if none)"""
+        slot = REVIEW_SLOTS[topic]
+        due, step = self.reviews[slot], self.reviews[slot + 1]
+        if correct:
+            if not due or now < due:
+                # Only a review answered once it is due stretches the interval
+                return due
+            step += 1
+        else:
+            step = 0
+        if step < len(REVIEW_INTERVALS):
+            due = math.ceil(now + REVIEW_INTERVALS[step])
+        else:
+            due = step = 0
+        self.reviews[slot] = due
+        self.reviews[slot + 1] = step
+        self.next_review = float(min(filter(None, self.reviews[::2]), default=0))
+        return due
+
+    def reviews_due(self, now):
+        """Topics due for review at `now`, most overdue first"""
+        if not 0 < self.next_review <= now:
+            return []
+        reviews = self.reviews
+        due = [(reviews[slot], topic) for topic, slot in REVIEW_SLOTS.items()
+               if 0 < reviews[slot] <= now]
+        return [topic for _, topic in sorted(due)]
+
+    def has_seen(self, bit):
+        """Whether the problem at a seen_bit has been served"""
+        return bit >> 3 < len(self.seen) and bool(self.seen[bit >> 3] & 1 << (bit & 7))
+
+    def mark_seen(self, bit):
+        if bit >> 3 >= len(self.seen):
+            self.seen.extend(bytes((bit >> 3) + 1 - len(self.seen)))
+        self.seen[bit >> 3] |= 1 << (bit & 7)
+
+    def unseen_bit(self, topic, difficulty, bit):
+        """First unseen problem of the difficulty's draw_region at or after `bit`, wrapping round.
+
+        Once every problem of the region has been seen they are all
+        forgotten and a new round starts with `bit` itself.
+        """
+        region = draw_region(topic, difficulty)
+        start = bisect_left(region, bit)
+        seen = self.seen
+        for i in range(len(region)):
+            candidate = region[(start + i) % len(region)]
+            if candidate >> 3 >= len(seen) or not seen[candidate >> 3] & 1 << (candidate & 7):
+                return candidate
+        for candidate in region:
+            if candidate >> 3 < len(seen):
+                seen[candidate >> 3] &= ~(1 << (candidate & 7))
+        return bit
+
+    def progress(self):
+        """The progress record in the original nested-dict form"""
+        stats = self.stats
+        return {
+            'geometry': {'correct': stats.correct('geometry'), 'total': stats.total('geometry'),
+                         'topics_covered': set(self.topics_covered('geometry'))},
+            'algebra': {'correct': stats.correct('algebra'), 'total': stats.total('algebra'),
+                        'topics_covered': set(self.topics_covered('algebra'))},
+            'difficulty_level': DIFFICULTIES[self.level()],
+        }
+
+    def snapshot(self):
+        """JSON-serialisable copy, including any problem still being worked on"""
+        stats = self.stats
+        width = len(DIFFICULTIES)
+        return {
+            'geometry': {'correct': stats.correct('geometry'), 'total': stats.total('geometry'),
+                         'topics_covered': self.topics_covered('geometry')},
+            'algebra': {'correct': stats.correct('algebra'), 'total': stats.total('algebra'),
+                        'topics_covered': self.topics_covered('algebra')},
+            'difficulty_level': DIFFICULTIES[self.level()],
+            'stats': stats.snapshot(),
+            'mastery': {topic: [round(units / MASTERY_SCALE, 4)
+                                for units in self.mastery[i*width:(i + 1)*width]]
+                        for i, topic in enumerate(TOPICS)},
+            'current': {'geometry': self.geometry, 'algebra': self.algebra},
+            'problems': self.problems,
+            'seen': self.seen.rstrip(b'\0').hex(),
+            'reviews': {topic: [self.reviews[slot], REVIEW_INTERVALS[self.reviews[slot + 1]]]
+                        for topic, slot in REVIEW_SLOTS.items() if self.reviews[slot]},
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        state = cls()
+        if 'stats' in snapshot:
+            state.stats = ProgressStats.from_snapshot(snapshot['stats'])
+        for subject in ('geometry', 'algebra'):
+            if 'stats' not in snapshot:
+                # Older snapshots only carry subject totals
+                slot = ProgressStats.SLOTS[subject]
+                state.stats.counts[2*slot] = snapshot[subject]['correct']
+                state.stats.counts[2*slot + 1] = snapshot[subject]['total']
+            for topic in snapshot[subject]['topics_covered']:
+                state.topics |= TOPIC_BITS[topic]
+
+        if 'mastery' in snapshot:
+            width = len(DIFFICULTIES)
+            for topic, values in snapshot['mastery'].items():
+                base = MASTERY_SLOTS[topic]
+                state.mastery[base:base + width] = array(
+                    'H', (round(p * MASTERY_SCALE) for p in values))
+        else:
+            # Older snapshots only carry one level for everything
+            level = DIFFICULTIES.index(snapshot['difficulty_level'])
+            for topic in TOPICS:
+                state.set_level(topic, level)
+
+        current = snapshot.get('current') or {}
+        if current.get('geometry'):
+            state.geometry = tuple(current['geometry'])
+        if current.get('algebra'):
+            state.algebra = tuple(current['algebra'])
+        state.problems = snapshot.get('problems', 0)
+        state.seen = bytearray.fromhex(snapshot.get('seen', ''))
+        for topic, (due, interval) in snapshot.get('reviews', {}).items():
+            slot = REVIEW_SLOTS[topic]
+            step = min(range(len(REVIEW_INTERVALS)),
+                       key=lambda step: abs(REVIEW_INTERVALS[step] - interval))
+            state.reviews[slot:slot + 2] = array('I', (math.ceil(due), step))
+        state.next_review = float(min(filter(None, state.reviews[::2]), default=0))
+        return state
+
+    def footprint(self):
+        """Approximate bytes held by this state object"""
+        stats = self.stats
+        size = (sys.getsizeof(self) + sys.getsizeof(stats) + sys.getsizeof(stats.counts)
+                + sys.getsizeof(self.mastery) + sys.getsizeof(self.reviews)
+                + sys.getsizeof(self.seen) + sys.getsizeof(self.last_seen))
+        for current in (self.geometry, self.algebra):
+            if current is not None:
+                size += sys.getsizeof(current)
+        return size
+
+
+def report_heading(now):
+    """Title and timestamp of a progress report, kept out of the report cache"""
+    return _report_heading(int(now))
+
+
+@lru_cache(maxsize=1)
+def _report_heading(second):
+    # The timestamp shows whole seconds, so one rendering serves a whole second
+    return (f"📊 LEARNING PROGRESS REPORT\n"
+            f"Generated: {datetime.fromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+
+class ReportCache:
+    """Bounded LRU of rendered progress reports, one per student.
+
+    Reports are kilobytes of text, so they are kept here rather than in the
+    compact StudentState. An entry holds the state it was rendered from and
+    is only reused for that same state object with the same key: a student
+    rehydrated from a snapshot starts a fresh stats version and must not
+    pick up a report rendered before eviction.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()   # student_id -> (state, key, text)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, student_id, state, key):
+        entry = self._entries.get(student_id)
+        if entry is None or entry[0] is not state or entry[1] != key:
+            return None
+        self._entries.move_to_end(student_id)
+        return entry[2]
+
+    def put(self, student_id, state, key, text):
+        self._entries[student_id] = (state, key, text)
+        self._entries.move_to_end(student_id)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, student_id):
+        self._entries.pop(student_id, None)
+
+
+class TutoringEngine:
+    """One student's tutoring session, independent of any GUI.
+
+    The engine is a thin set of operations over a StudentState, so a server
+    can keep only the compact states and wrap one in an engine per request.
+    The current geometry and algebra problems are kept separately so that
+    generating one never clobbers the answer of the other.
+
+    With a `seed`, the n-th problem of the session is problem_code_at(seed,
+    n, ...), so a session can be replayed exactly; the pool is bypassed.
+
+    Review times come from `clock` (default time.time). With `reviews`, an
+    its_review.ReviewQueue shared by many sessions, every change to the
+    student's review schedule is also pushed there. Rendered progress
+    reports go in `reports`, a ReportCache that a server can share across
+    sessions; by default the engine keeps just its own latest report.
+    """
+
+    __slots__ = ('rng', 'store', 'student_id', 'state', 'pool', 'seed', 'reviews', 'clock',
+                 'reports')
+
+    def __init__(self, rng=None, store=None, student_id='default', state=None, pool=None,
+                 seed=None, reviews=None, clock=None, reports=None):
+        self.rng = rng if rng is not None else random.Random()
+        # Optional its_pool.ProblemPool of pre-generated problem codes
+        self.pool = pool
+        self.seed = seed
+        self.reviews = reviews
+        self.clock = clock if clock is not None else time.time
+        self.reports = reports if reports is not None else ReportCache(1)
+
+        # Optional its_store.ProgressStore; attempts are queued, never awaited
+        self.store = store
+        self.student_id = student_id
+        if state is None:
+            state = StudentState()
+            if store is not None:
+                snapshot = store.load_progress(student_id)
+                if snapshot is not None:
+                    state = StudentState.from_snapshot(snapshot)
+        self.state = state
+
+    @property
+    def student_progress(self):
+        return self.state.progress()
+
+    @property
+    def difficulty_level(self):
+        return DIFFICULTIES[self.state.level()]
+
+    def skill_difficulty(self, topic):
+        """Difficulty to serve next for a topic, from the student's mastery of it"""
+        return DIFFICULTIES[self.state.skill_level(topic)]
+
+    def mastery(self, topic, difficulty=None):
+        """BKT estimate that the student knows a topic at a difficulty (default: current)"""
+        level = (self.state.skill_level(topic) if difficulty is None
+                 else DIFFICULTIES.index(difficulty))
+        return self.state.mastery[MASTERY_SLOTS[topic] + level] / MASTERY_SCALE
+
+    def due_reviews(self):
+        """Topics due for review now, most overdue first"""
+        return self.state.reviews_due(self.clock())
+
+    def due_review(self, subject):
+        """The subject's most overdue topic, or None if nothing is due"""
+        topics = SHAPES if subject == 'geometry' else ALGEBRA_TOPICS
+        for topic in self.due_reviews():
+            if topic in topics:
+                return topic
+        return None
+
+    def current(self, subject):
+        """(problem, answer) currently set for a subject, or (None, None)"""
+        if subject == 'geometry':
+            if self.state.geometry is None:
+                return None, None
+            return geometry_problem(*self.state.geometry)
+
+        if self.state.algebra is None:
+            return None, None
+        return algebra_problem(*self.state.algebra)
+
+    @property
+    def current_problem(self):
+        return {'geometry': self.current('geometry')[0], 'algebra': self.current('algebra')[0]}
+
+    @property
+    def current_answer(self):
+        return {'geometry': self.current('geometry')[1], 'algebra': self.current('algebra')[1]}
+
+    def draw_code(self, topic, difficulty):
+        """Next problem code the student has not seen yet.
+
+        Codes come from the seeded stream, the pool or a fresh draw, and
+        seen ones are redrawn; after SEEN_TRIES the nearest unseen problem
+        of the difficulty is taken instead.
+        """
+        state = self.state
+        for _ in range(SEEN_TRIES):
+            code = self._next_code(topic, difficulty)
+            bit = seen_bit(code)
+            if not state.has_seen(bit):
+                break
+        else:
+            unseen = state.unseen_bit(topic, difficulty, bit)
+            if unseen != bit:
+                code = seen_code(topic, difficulty, unseen)
+                bit = unseen
+        state.mark_seen(bit)
+        return code
+
+    def _next_code(self, topic, difficulty):
+        if self.seed is not None:
+            code = problem_code_at(self.seed, self.state.problems, topic, difficulty)
+        elif self.pool is not None:
+            code = self.pool.get(topic, difficulty)
+        else:
+            code = draw_problem_code(topic, difficulty, self.rng)
+        self.state.problems += 1
+        return code
+
+    def generate_geometry_problem(self, shape=None):
+        """New problem for a shape; without one, the shape most overdue for review"""
+        due = self.due_reviews()
+        if shape is None:
+            shape = next((topic for topic in due if topic in SHAPES), SHAPES[0])
+        code = self.draw_code(shape, self.skill_difficulty(shape))
+        self.state.geometry = code
+        problem, answer = geometry_problem(*code)
+        return {'problem': problem, 'text': problem_text(problem), 'review': shape in due}
+
+    def generate_algebra_problem(self, difficulty=None):
+        """New quadratic; the difficulty defaults to the student's mastery level"""
+        if difficulty is None:
+            difficulty = self.skill_difficulty('quadratic_equations')
+        code = self.draw_code('quadratic', difficulty)
+        self.state.algebra = code
+        problem, answer = algebra_problem(*code)
+        return {'problem': problem, 'text': problem_text(problem),
+                'review': 'quadratic_equations' in self.due_reviews()}
+
+    def set_difficulty(self, difficulty, topics=TOPICS):
+        """Move the student to a difficulty on some topics and warm the pool for it"""
+        for topic in topics:
+            self.state.set_level(topic, DIFFICULTIES.index(difficulty))
+        self.reports.discard(self.student_id)
+        if self.pool is not None:
+            self.pool.prime(difficulty)
+
+    def check_geometry_answer(self, user_input):
+        """Grade a typed geometry answer and return the feedback as data"""
+        problem, correct_answer = self.current('geometry')
+        if problem is None:
+            return {'valid': False, 'correct': False, 'feedback': NO_PROBLEM_YET}
+        try:
+            user_answer, correct = grade_geometry(user_input, correct_answer)
+        except (TypeError, ValueError, AttributeError):
+            return {'valid': False, 'correct': False, 'feedback': "Please enter a valid number."}
+
+        if correct:
+            feedback = f" Excellent! That's correct!\n\nYour answer: {user_answer}\nCorrect answer: {correct_answer}\n\n"
+            feedback += geometry_explanation(problem, correct_answer)
+        else:
+            feedback = f" Not quite right. Try again!\n\nYour answer: {user_answer}\nCorrect answer: {correct_answer}\n\n"
+            feedback += " Review the formula and check your calculation."
+
+        self.record_attempt('geometry', problem['type'], correct, problem['difficulty'])
+        self.save_attempt('geometry', problem, correct, self.state.geometry)
+
+        return {'valid': True, 'correct': correct, 'user_answer': user_answer,
+                'correct_answer': correct_answer, 'feedback': feedback}
+
+    def check_algebra_answer(self, user_input):
+        """Grade comma-separated roots and return the feedback as data"""
+        problem, correct_solutions = self.current('algebra')
+        if problem is None:
+            return {'valid': False, 'correct': False, 'feedback': NO_PROBLEM_YET}
+        try:
+            user_solutions, correct = grade_algebra(user_input, correct_solutions)
+        except (TypeError, ValueError, AttributeError):
+            return {'valid': False, 'correct': False,
+                    'feedback': "Please enter valid numbers separated by commas (e.g., 2.5, -1.3)"}
+
+        if correct:
+            feedback = f" Excellent! That's correct!\n\nYour solutions: {user_solutions}\nCorrect solutions: {correct_solutions}\n\n"
+            feedback += algebra_explanation(problem)
+        else:
+            feedback = f" Not quite right. Try again!\n\nYour solutions: {user_solutions}\nCorrect solutions: {correct_solutions}\n\n"
+            feedback += " Check your calculation using the quadratic formula."
+
+        self.record_attempt('algebra', 'quadratic_equations', correct, problem['difficulty'])
+        self.save_attempt('algebra', problem, correct, self.state.algebra)
+
+        return {'valid': True, 'correct': correct, 'user_answer': user_solutions,
+                'correct_answer': correct_solutions, 'feedback': feedback}
+
+    def record_attempt(self, subject, topic, correct, difficulty=None):
+        """Count an attempt and update mastery of the topic at the problem's difficulty"""
+        state = self.state
+        state.stats.record(subject, topic, correct)
+        state.topics |= TOPIC_BITS[topic]
+        if difficulty is None:
+            difficulty = self.skill_difficulty(topic)
+        if state.update_mastery(topic, difficulty, correct) and self.pool is not None:
+            self.pool.prime(self.skill_difficulty(topic))
+        due = state.schedule_review(topic, correct, self.clock())
+        if self.reviews is not None:
+            self.reviews.schedule(self.student_id, topic, due)
+
+    def save_attempt(self, subject, problem, correct, code=None):
+        if self.store is None:
+            return
+        topic = problem['type'] if subject == 'geometry' else 'quadratic_equations'
+        self.store.record_attempt(self.student_id, subject, topic, problem['difficulty'],
+                                  correct, self.progress_snapshot(), code)
+
+    def get_geometry_explanation(self):
+        problem, answer = self.current('geometry')
+        if problem is None:
+            return NO_PROBLEM_YET
+        return geometry_explanation(problem, answer)
+
+    def get_geometry_hint(self):
+        problem = self.current('geometry')[0]
+        return NO_PROBLEM_YET if problem is None else geometry_hint(problem)
+
+    def get_algebra_explanation(self):
+        problem = self.current('algebra')[0]
+        return NO_PROBLEM_YET if problem is None else algebra_explanation(problem)
+
+    def rates(self):
+        """Geometry and algebra lifetime success rates as fractions"""
+        stats = self.state.stats
+        return stats.rate('geometry'), stats.rate('algebra')
+
+    def get_learning_recommendations(self):
+        geometry_rate, algebra_rate = self.rates()
+        shape_mask = self.state.topics & SHAPE_MASK
+        text = learning_recommendations(rate_band(geometry_rate), rate_band(algebra_rate), shape_mask)
+        due = self.due_reviews()
+        if due:
+            topics = ', '.join(topic.replace('_', ' ') for topic in due)
+            text = f"• Time to review: {topics}\n{text}"
+        return text
+
+    def progress_report(self):
+        """Progress report text, re-rendered after a new attempt or a review falling due"""
+        state = self.state
+        key = state.stats.version
+        now = self.clock()
+        if 0 < state.next_review <= now:
+            # Reviews only fall due between attempts, so how many are due pins down which
+            key = (key, len(state.reviews_due(now)))
+        body = self.reports.get(self.student_id, state, key)
+        if body is None:
+            body = self.progress_report_body()
+            self.reports.put(self.student_id, state, key, body)
+        return report_heading(now) + body
+
+    def render_progress_report(self):
+        """Progress report text rendered from scratch"""
+        return report_heading(self.clock()) + self.progress_report_body()
+
+    def progress_report_body(self):
+        """Everything in the report below its timestamp, which is what gets cached"""
+        stats = self.state.stats
+        geometry_rate, algebra_rate = self.rates()
+        total = stats.total_attempts()
+        total_correct = stats.total_correct()
+        geometry_topics = self.state.topics_covered('geometry')
+        algebra_topics = self.state.topics_covered('algebra')
+
+        return f""" CURRENT DIFFICULTY LEVEL: {self.difficulty_level.upper()}
+
+ SKILL MASTERY:
+{self.mastery_summary()}
+
+ GEOMETRY PROGRESS:
+• Problems Attempted: {stats.total('geometry')}
+• Problems Correct: {stats.correct('geometry')}
+• Success Rate: {geometry_rate * 100:.1f}%
+• Topics Covered: {', '.join(geometry_topics) if geometry_topics else 'None yet'}
+
+ ALGEBRA PROGRESS:
+• Problems Attempted: {stats.total('algebra')}
+• Problems Correct: {stats.correct('algebra')}
+• Success Rate: {algebra_rate * 100:.1f}%
+• Topics Covered: {', '.join(algebra_topics) if algebra_topics else 'None yet'}
+
+ OVERALL PERFORMANCE:
+• Total Problems: {total}
+• Total Correct: {total_correct}
+• Overall Success Rate: {success_rate(total_correct, total) * 100:.1f}%
+
+ RECOMMENDATIONS:
+{self.get_learning_recommendations()}
+
+ ADAPTIVE LEARNING STATUS:
+Each topic moves up a difficulty once you have mastered it at the current one.
+Keep practicing to unlock more challenging problems!
+        """
+
+    def mastery_summary(self):
+        state = self.state
+        lines = []
+        for topic in TOPICS:
+            level = state.skill_level(topic)
+            lines.append(f"• {TOPIC_NAMES[topic]}: {DIFFICULTIES[level]}, "
+                         f"{self.mastery(topic, DIFFICULTIES[level]):.0%} mastered")
+        return '\n'.join(lines)
+
+    def progress_snapshot(self):
+        """JSON-serialisable copy of the progress record"""
+        return self.state.snapshot()
+
+    def restore_progress(self, snapshot):
+        """Load a record produced by progress_snapshot"""
+        self.state = StudentState.from_snapshot(snapshot)
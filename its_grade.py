@@ -0,0 +1,264 @@
+"""Bulk grading of offline submissions.
+
+Reads CSV or JSONL files of (problem parameters, submitted answer) records
+and grades each one with the same rules as the tutor: geometry areas within
+GEOMETRY_TOLERANCE, quadratic roots rounded to 2dp and matched as a set.
+Answers may be fractions or simple arithmetic ("1/2", "-3/4", "(1+2)/3").
+
+Records are streamed: input is read, graded and written in fixed-size
+chunks, so memory stays flat however large the file is; only the
+per-student summary grows, with the number of students. Large files are
+graded on all cores with a bounded number of chunks in flight.
+
+A record names the problem with `type` (a shape, or `quadratic`), its
+dimensions or `a`, `b`, `c`, and the `answer`; `student_id` and
+`difficulty` are optional. In JSONL the problem fields may also sit in a
+nested "problem" object, as its_server returns them.
+
+    python its_grade.py submissions.csv -o graded.csv --summary students.json
+    python its_grade.py submissions.jsonl -o graded.jsonl -j 8
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from itertools import islice
+
+from its_engine import (GEOMETRY_RANGES, SHAPES, geometry_answer, grade_algebra, grade_geometry,
+                        quadratic_solutions)
+
+CHUNK_SIZE = 2000
+# Files at least this big are graded on every core unless --jobs says otherwise
+PARALLEL_MIN_BYTES = 4 << 20
+
+OUTPUT_FIELDS = ['record', 'student_id', 'subject', 'topic', 'difficulty', 'answer',
+                 'parsed', 'expected', 'valid', 'correct', 'error']
+
+QUADRATIC_TYPES = ('quadratic', 'quadratic_equations')
+
+
+def _number(value):
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    return value
+
+
+def record_problem(record):
+    """(subject, problem dict, expected answer) for a submission record.
+
+    Raises ValueError or KeyError when the problem fields are missing or bad.
+    """
+    source = record.get('problem') or record
+    kind = source.get('type') or source.get('shape')
+    difficulty = source.get('difficulty') or record.get('difficulty') or ''
+
+    if kind in SHAPES:
+        problem = {'type': kind, 'difficulty': difficulty}
+        # Every difficulty uses the same dimension names for a shape
+        for name in GEOMETRY_RANGES[kind]['beginner']:
+            problem[name] = _number(source[name])
+        return 'geometry', problem, geometry_answer(problem)
+
+    if kind in QUADRATIC_TYPES:
+        problem = {'type': 'quadratic', 'difficulty': difficulty,
+                   'a': _number(source['a']), 'b': _number(source['b']), 'c': _number(source['c'])}
+        if problem['a'] == 0:
+            raise ValueError("a must not be 0")
+        return 'algebra', problem, quadratic_solutions(problem['a'], problem['b'], problem['c'],
+                                                       difficulty)
+
+    raise ValueError(f"Unknown problem type: {kind!r}")
+
+
+def grade_record(number, record):
+    """Grade one submission; never raises, bad records come back with an error"""
+    result = {'record': number, 'student_id': '', 'subject': '', 'topic': '', 'difficulty': '',
+              'answer': '', 'parsed': None, 'expected': None, 'valid': False, 'correct': False,
+              'error': ''}
+    if not isinstance(record, dict):
+        # read_records passes unreadable lines on as the ValueError they raised
+        reason = record if isinstance(record, ValueError) else "not a JSON object"
+        result['error'] = f"Bad record: {reason}"
+        return result
+    result.update(student_id=record.get('student_id', ''), answer=record.get('answer', ''))
+    try:
+        subject, problem, expected = record_problem(record)
+    except (AttributeError, KeyError, TypeError, ValueError) as error:
+        result['error'] = f"Bad problem: {error}"
+        return result
+
+    result.update(subject=subject, difficulty=problem['difficulty'], expected=expected,
+                  topic=problem['type'] if subject == 'geometry' else 'quadratic_equations')
+    answer = str(result['answer'])
+    try:
+        if subject == 'geometry':
+            result['parsed'], result['correct'] = grade_geometry(answer, expected)
+        else:
+            result['parsed'], result['correct'] = grade_algebra(answer, expected)
+        result['valid'] = True
+    except ValueError as error:
+        result['error'] = f"Bad answer: {error}"
+    return result
+
+
+def grade_chunk(chunk):
+    return [grade_record(number, record) for number, record in chunk]
+
+
+def grade_stream(records, jobs=1, chunk_size=CHUNK_SIZE):
+    """Yield graded results for (number, record) pairs, in input order"""
+    records = iter(records)
+    chunks = iter(lambda: list(islice(records, chunk_size)), [])
+    if jobs <= 1:
+        for chunk in chunks:
+            yield from grade_chunk(chunk)
+        return
+
+    with multiprocessing.Pool(jobs) as pool:
+        # Pool.imap would read the whole input ahead; keep a bounded window instead
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(grade_chunk, (chunk,)))
+            if len(pending) >= 2 * jobs:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def file_format(path, default='csv'):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    if extension == '.csv':
+        return 'csv'
+    return default
+
+
+def read_records(f, fmt):
+    """Yield (record number, record) from an open CSV or JSONL file.
+
+    A JSONL line that is not valid JSON is yielded as a ValueError, for
+    grade_record to report, instead of ending the run.
+    """
+    if fmt == 'csv':
+        # Empty cells mean "not given", like a missing JSON key
+        rows = ({key: value for key, value in row.items() if value not in ('', None)}
+                for row in csv.DictReader(f))
+        yield from enumerate(rows, 1)
+        return
+    number = 0
+    for line in f:
+        if line.strip():
+            number += 1
+            try:
+                yield number, json.loads(line)
+            except ValueError as error:
+                # A plain ValueError: JSONDecodeError does not survive pickling to a worker
+                yield number, ValueError(str(error))
+
+
+class Summary:
+    """Per-student attempt, validity and per-topic correctness counts"""
+
+    def __init__(self):
+        self.students = {}
+
+    def add(self, result):
+        student = self.students.get(result['student_id'])
+        if student is None:
+            student = self.students[result['student_id']] = {
+                'attempts': 0, 'valid': 0, 'correct': 0, 'topics': {}}
+        student['attempts'] += 1
+        student['valid'] += result['valid']
+        student['correct'] += result['correct']
+        if result['topic']:
+            topic = student['topics'].setdefault(result['topic'], {'attempts': 0, 'correct': 0})
+            topic['attempts'] += 1
+            topic['correct'] += result['correct']
+
+    def report(self):
+        report = {}
+        for student_id, student in self.students.items():
+            report[student_id] = dict(student, rate=student['correct'] / student['attempts'])
+        return report
+
+
+class ResultWriter:
+    def __init__(self, f, fmt):
+        self.f = f
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(f, OUTPUT_FIELDS, lineterminator='\n')
+            self.writer.writeheader()
+
+    def write(self, result):
+        if self.fmt == 'csv':
+            row = dict(result)
+            for name in ('parsed', 'expected'):
+                if isinstance(row[name], list):
+                    row[name] = ', '.join(f'{root:g}' for root in row[name])
+            self.writer.writerow(row)
+        else:
+            self.f.write(json.dumps(result) + '\n')
+
+
+def grade_file(source, output, source_format=None, output_format=None, jobs=None,
+               chunk_size=CHUNK_SIZE):
+    """Grade a file of submissions into `output`; returns the Summary"""
+    source_format = source_format or file_format(source)
+    if jobs is None:
+        large = source != '-' and os.path.getsize(source) >= PARALLEL_MIN_BYTES
+        jobs = (os.cpu_count() or 1) if large else 1
+
+    summary = Summary()
+    infile = sys.stdin if source == '-' else open(source, newline='', encoding='utf-8')
+    outfile = sys.stdout if output == '-' else open(output, 'w', newline='', encoding='utf-8')
+    try:
+        writer = ResultWriter(outfile, output_format or file_format(output, source_format))
+        for result in grade_stream(read_records(infile, source_format), jobs, chunk_size):
+            writer.write(result)
+            summary.add(result)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade a CSV/JSONL file of submissions")
+    parser.add_argument('source', help="Submissions file, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="Graded results file (default: stdout)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'],
+                        help="Input format (default: from the file extension)")
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'])
+    parser.add_argument('--summary', help="Write per-student summaries to this JSON file")
+    parser.add_argument('-j', '--jobs', type=int,
+                        help="Worker processes (default: all cores for large files, else 1)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    summary = grade_file(args.source, args.output, args.format, args.output_format,
+                         args.jobs, args.chunk_size)
+    report = summary.report()
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    attempts = sum(student['attempts'] for student in report.values())
+    correct = sum(student['correct'] for student in report.values())
+    invalid = sum(student['attempts'] - student['valid'] for student in report.values())
+    print(f"Graded {attempts} submissions from {len(report)} students: "
+          f"{correct} correct, {invalid} invalid", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
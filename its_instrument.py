@@ -0,0 +1,205 @@
+"""Opt-in timing of GUI handlers and detection of main-loop stalls.
+
+Instrumentation.instrument() replaces the named handlers on an object with
+timed wrappers that keep a call count, total/max time and a log2 latency
+histogram per handler. StallWatchdog keeps a heartbeat scheduled on the Tk
+loop; a background thread notices when the heartbeat is late by more than a
+threshold and records the main thread's stack at that moment, i.e. the code
+that is blocking the window.
+
+Nothing is wrapped and no thread is started unless instrumentation is
+enabled, so a disabled layer costs nothing. The desktop app only imports
+this module when ITS_INSTRUMENT is set, and then also reports how long the
+window took to first appear:
+
+    ITS_INSTRUMENT=1 python its_system.py            # text report on exit
+    ITS_INSTRUMENT=perf.json python its_system.py    # JSON snapshot on exit
+"""
+import functools
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+# Handlers run from Tk buttons in its_system
+GUI_HANDLERS = ['generate_geometry_problem', 'check_geometry_answer', 'show_geometry_hint',
+                'generate_algebra_problem', 'check_algebra_answer', 'show_algebra_steps',
+                'update_progress_display', 'on_tab_changed']
+
+# Histogram bucket i counts calls taking [2**(i-1), 2**i) microseconds
+BUCKETS = 32
+
+
+class HandlerStats:
+    __slots__ = ('calls', 'total_ns', 'max_ns', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * BUCKETS
+
+    def record(self, elapsed_ns):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.histogram[min((elapsed_ns // 1000).bit_length(), BUCKETS - 1)] += 1
+
+    def percentile_us(self, percent):
+        """Upper bound of the histogram bucket holding the given percentile"""
+        rank = self.calls * percent / 100
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= rank:
+                return min(float(1 << bucket), self.max_ns / 1000)
+        return 0.0
+
+    def snapshot(self):
+        return {
+            'calls': self.calls,
+            'mean_us': self.total_ns / self.calls / 1000 if self.calls else 0.0,
+            'max_us': self.max_ns / 1000,
+            'p50_us': self.percentile_us(50),
+            'p90_us': self.percentile_us(90),
+            'p99_us': self.percentile_us(99),
+            'histogram_us': {1 << bucket: count for bucket, count in enumerate(self.histogram) if count},
+        }
+
+
+class Instrumentation:
+    """Per-handler counters and latency histograms"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.handlers = {}
+        self.watchdog = None
+        # Seconds from start-up until the window was first drawn, once known
+        self.startup = None
+
+    def wrap(self, name, handler):
+        """Timed version of handler, or handler itself when disabled"""
+        if not self.enabled:
+            return handler
+        stats = self.handlers.setdefault(name, HandlerStats())
+        clock = time.perf_counter_ns
+
+        @functools.wraps(handler)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                stats.record(clock() - start)
+        return timed
+
+    def instrument(self, obj, names=GUI_HANDLERS):
+        """Shadow obj's bound methods with timed wrappers.
+
+        Must run before the methods are handed to Tk as button commands.
+        """
+        if not self.enabled:
+            return
+        for name in names:
+            setattr(obj, name, self.wrap(name, getattr(obj, name)))
+
+    def watch(self, root, threshold=0.25, interval=0.05):
+        """Start a StallWatchdog on a Tk root"""
+        if not self.enabled:
+            return None
+        self.watchdog = StallWatchdog(root, threshold, interval)
+        self.watchdog.start()
+        return self.watchdog
+
+    def snapshot(self):
+        return {
+            'startup_seconds': self.startup,
+            'handlers': {name: stats.snapshot() for name, stats in self.handlers.items()},
+            'stalls': self.watchdog.snapshot() if self.watchdog is not None else [],
+        }
+
+    def format_text(self):
+        lines = []
+        if self.startup is not None:
+            lines.append(f"First frame drawn {self.startup * 1000:.0f}ms after start-up\n")
+        lines += [f"{'handler':28} {'calls':>7} {'mean':>10} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>10}"]
+        for name, stats in sorted(self.handlers.items()):
+            s = stats.snapshot()
+            lines.append(f"{name:28} {s['calls']:>7} {s['mean_us']:>8.0f}us {s['p50_us']:>7.0f}us "
+                         f"{s['p90_us']:>7.0f}us {s['p99_us']:>7.0f}us {s['max_us']:>8.0f}us")
+        stalls = self.watchdog.snapshot() if self.watchdog is not None else []
+        lines.append(f"\n{len(stalls)} main-loop stall(s)")
+        for stall in stalls:
+            length = "ongoing" if stall['seconds'] is None else f"{stall['seconds'] * 1000:.0f}ms"
+            lines.append(f"\nStall ({length}) at "
+                         f"{time.strftime('%H:%M:%S', time.localtime(stall['time']))}:")
+            lines.append(stall['stack'].rstrip())
+        return '\n'.join(lines)
+
+    def dump(self, path):
+        """Write a snapshot: JSON for *.json paths, text otherwise"""
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith('.json'):
+                json.dump(self.snapshot(), f, indent=2)
+            else:
+                f.write(self.format_text())
+            f.write('\n')
+
+    def close(self):
+        if self.watchdog is not None:
+            self.watchdog.stop()
+
+
+class StallWatchdog:
+    """Detects Tk main-loop stalls longer than `threshold` seconds"""
+
+    def __init__(self, root, threshold=0.25, interval=0.05, max_stalls=100):
+        self.root = root
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = deque(maxlen=max_stalls)
+        self._beat = time.monotonic()
+        self._main_thread = threading.main_thread().ident
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='its-stall-watchdog', daemon=True)
+        self._after_id = None
+
+    def start(self):
+        self._heartbeat()
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _heartbeat(self):
+        # Runs on the Tk thread; the gap between beats is how long the loop was busy
+        now = time.monotonic()
+        stall = self.stalls[-1] if self.stalls else None
+        if stall is not None and stall['seconds'] is None:
+            stall['seconds'] = max(0.0, now - self._beat - self.interval)
+        self._beat = now
+        self._after_id = self.root.after(int(self.interval * 1000), self._heartbeat)
+
+    def _run(self):
+        reported = None
+        while not self._stopped.wait(self.interval):
+            beat = self._beat
+            if beat == reported or time.monotonic() - beat < self.threshold + self.interval:
+                continue
+            # Report each stall once, with the stack that is holding up the loop
+            reported = beat
+            frame = sys._current_frames().get(self._main_thread)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else ''
+            self.stalls.append({'time': time.time(), 'seconds': None, 'stack': stack})
+            print(f"Main loop stalled for over {self.threshold * 1000:.0f}ms in:\n{stack}",
+                  file=sys.stderr)
+
+    def snapshot(self):
+        """Stalls so far; seconds is None while a stall is still in progress"""
+        return [dict(stall) for stall in self.stalls]
@@ -0,0 +1,182 @@
+"""Item response theory calibration of the problem generators.
+
+Every logged attempt records the problem code that was answered.
+its_engine.item_bucket groups codes into items: a shape with each dimension
+in a band of GEOMETRY_BUCKET_WIDTH, or a quadratic catalogue with its
+leading coefficient and whether the roots are whole numbers. A
+two-parameter logistic model
+
+    P(correct) = 1 / (1 + exp(-a_i * (theta_s - b_i)))
+
+is then fitted for every student s and item i together. Attempts are first
+collapsed into (student, item, tries, correct) counts; abilities and item
+parameters are then updated in alternating Newton steps, vectorised over
+all students or all items at once with np.bincount. Weak normal priors keep
+the estimates finite for students or items with all-correct or all-wrong
+records, and the abilities are rescaled to mean 0, standard deviation 1
+after every step so b is in the same units as DIFFICULTY_TARGETS.
+
+The output is the lookup table its_engine.load_item_table reads: per family,
+the buckets with their difficulty b, discrimination a and attempt count,
+leaving out buckets with fewer than `min_attempts` attempts.
+
+Requires numpy. Run with:
+
+    python its_irt.py --db progress.db -o items.json
+    python its_server.py --item-table items.json
+"""
+import argparse
+import json
+import sys
+from array import array
+
+import numpy as np
+
+from its_engine import GEOMETRY_BUCKET_WIDTH, item_bucket
+from its_store import DEFAULT_PATH, ProgressStore
+
+# Prior variances: ability N(0, 1), difficulty N(0, 4), discrimination N(1, 1)
+THETA_VARIANCE = 1.0
+B_VARIANCE = 4.0
+A_VARIANCE = 1.0
+A_RANGE = (0.2, 4.0)
+# Largest change of any parameter in one Newton step
+MAX_STEP = 1.0
+MIN_ATTEMPTS = 30
+
+
+def collect_responses(rows):
+    """Collapse (student_id, code, correct) rows to per (student, item) counts.
+
+    Returns (student, item, tries, correct) arrays, the item keys (family,
+    bucket) indexed by item, and the number of students.
+    """
+    students = {}
+    items = {}
+    student_codes = array('i')
+    item_codes = array('i')
+    outcomes = array('b')
+    for student_id, code, correct in rows:
+        student_codes.append(students.setdefault(student_id, len(students)))
+        item_codes.append(items.setdefault(item_bucket(code), len(items)))
+        outcomes.append(1 if correct else 0)
+
+    n_items = max(1, len(items))
+    pair = (np.frombuffer(student_codes, np.int32).astype(np.int64) * n_items
+            + np.frombuffer(item_codes, np.int32))
+    pairs, inverse = np.unique(pair, return_inverse=True)
+    tries = np.bincount(inverse, minlength=len(pairs)).astype(float)
+    correct = np.bincount(inverse, np.frombuffer(outcomes, np.int8), len(pairs))
+    return pairs // n_items, pairs % n_items, tries, correct, list(items), len(students)
+
+
+def _responses(student, item, theta, a, b, tries):
+    # Logit, expected correct and Fisher information per (student, item) pair
+    logit = a[item] * (theta[student] - b[item])
+    p = 1.0 / (1.0 + np.exp(-logit))
+    return logit, tries * p, tries * p * (1.0 - p)
+
+
+def fit_2pl(student, item, tries, correct, n_students, n_items, max_iter=200, tol=1e-7):
+    """MAP fit of a 2PL model; returns (theta, a, b, log likelihood, iterations)"""
+    theta = np.zeros(n_students)
+    a = np.ones(n_items)
+    b = np.zeros(n_items)
+    previous = -np.inf
+    loglik = 0.0
+    iteration = 0
+    for iteration in range(1, max_iter + 1):
+        _, expected, info = _responses(student, item, theta, a, b, tries)
+        residual = correct - expected
+        gradient = np.bincount(student, a[item] * residual, n_students) - theta / THETA_VARIANCE
+        curvature = np.bincount(student, a[item] ** 2 * info, n_students) + 1 / THETA_VARIANCE
+        theta += np.clip(gradient / curvature, -MAX_STEP, MAX_STEP)
+
+        # b then a, each against fresh residuals: stepping both from the same
+        # residuals overshoots once an item's a and b trade off against each other
+        _, expected, info = _responses(student, item, theta, a, b, tries)
+        residual = correct - expected
+        gradient = -np.bincount(item, a[item] * residual, n_items) - b / B_VARIANCE
+        curvature = np.bincount(item, a[item] ** 2 * info, n_items) + 1 / B_VARIANCE
+        b += np.clip(gradient / curvature, -MAX_STEP, MAX_STEP)
+
+        _, expected, info = _responses(student, item, theta, a, b, tries)
+        residual = correct - expected
+        gap = theta[student] - b[item]
+        gradient = np.bincount(item, gap * residual, n_items) - (a - 1) / A_VARIANCE
+        curvature = np.bincount(item, gap ** 2 * info, n_items) + 1 / A_VARIANCE
+        a = np.clip(a + np.clip(gradient / curvature, -MAX_STEP, MAX_STEP), *A_RANGE)
+
+        # Only the location is pinned while iterating. Rescaling every pass
+        # fights the shrinkage of the theta prior and can blow b up without bound
+        mean = theta.mean()
+        theta -= mean
+        b -= mean
+
+        logit, _, _ = _responses(student, item, theta, a, b, tries)
+        loglik = float(-(correct * np.logaddexp(0, -logit)
+                         + (tries - correct) * np.logaddexp(0, logit)).sum())
+        if abs(loglik - previous) < tol * abs(loglik):
+            break
+        previous = loglik
+
+    # Measure b in student standard deviations
+    spread = theta.std() or 1.0
+    return theta / spread, np.clip(a * spread, *A_RANGE), b / spread, loglik, iteration
+
+
+def build_table(keys, a, b, attempts, min_attempts=MIN_ATTEMPTS):
+    """Lookup table for its_engine.load_item_table"""
+    families = {}
+    for i in sorted(range(len(keys)), key=lambda i: (keys[i][0], keys[i][1])):
+        if attempts[i] < min_attempts:
+            continue
+        family, bucket = keys[i]
+        entry = families.setdefault(family, {'buckets': [], 'a': [], 'b': [], 'attempts': []})
+        entry['buckets'].append(list(bucket))
+        entry['a'].append(round(float(a[i]), 3))
+        entry['b'].append(round(float(b[i]), 3))
+        entry['attempts'].append(int(attempts[i]))
+    return {'bucket_width': GEOMETRY_BUCKET_WIDTH, 'families': families}
+
+
+def calibrate(rows, min_attempts=MIN_ATTEMPTS, max_iter=200):
+    """Fit items from (student_id, code, correct) rows; returns (table, log likelihood)"""
+    student, item, tries, correct, keys, n_students = collect_responses(rows)
+    if not keys:
+        return build_table([], [], [], []), 0.0
+    _, a, b, loglik, _ = fit_2pl(student, item, tries, correct, n_students, len(keys), max_iter)
+    attempts = np.bincount(item, tries, len(keys))
+    return build_table(keys, a, b, attempts, min_attempts), loglik
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate generated problems with a 2PL IRT model")
+    parser.add_argument('--db', default=DEFAULT_PATH, help="SQLite progress database")
+    parser.add_argument('-o', '--output', help="Write the lookup table to this JSON file")
+    parser.add_argument('--min-attempts', type=int, default=MIN_ATTEMPTS,
+                        help="Leave out buckets with fewer attempts")
+    parser.add_argument('--max-iter', type=int, default=200)
+    args = parser.parse_args()
+
+    store = ProgressStore(args.db)
+    try:
+        table, loglik = calibrate(store.iter_items(), args.min_attempts, args.max_iter)
+    finally:
+        store.close()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(table, f)
+            f.write('\n')
+    else:
+        json.dump(table, sys.stdout)
+        print()
+    for family, entry in sorted(table['families'].items()):
+        print(f"{family:10} {len(entry['b']):4} buckets, b from {min(entry['b']):+.2f} "
+              f"to {max(entry['b']):+.2f}", file=sys.stderr)
+    print(f"log likelihood {loglik:.1f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Pre-generated problems so 'New Problem' never waits on generation.
+
+ProblemPool keeps a small queue of ready problem codes for every
+(topic, difficulty) pair, where a topic is a shape or 'quadratic'. A daemon
+thread tops a queue back up to `high_watermark` whenever it drops below
+`low_watermark`, rendering each statement as it goes so the template cache
+is already warm when the problem is shown. The difficulty a student is
+moving to is refilled first. If a queue does run dry, get() falls back to
+generating inline, so the pool only ever makes things faster.
+
+Loading a new item table (its_engine.load_item_table) changes what each
+difficulty draws, so queued codes from the old table are thrown away.
+"""
+import random
+import threading
+from collections import deque
+
+from its_engine import (DIFFICULTIES, SHAPES, draw_problem_code, item_table_version,
+                        problem_from_code, problem_text)
+
+TOPICS = SHAPES + ['quadratic']
+
+
+class ProblemPool:
+    """Per (topic, difficulty) queues of problem codes refilled in the background"""
+
+    def __init__(self, low_watermark=8, high_watermark=32, rng=None):
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.rng = rng if rng is not None else random.Random()
+        # The worker thread draws from self.rng; inline misses get their own
+        self._miss_rng = random.Random(self.rng.getrandbits(64))
+        self._lock = threading.Lock()
+        self._version = item_table_version()
+        self._queues = {(topic, difficulty): deque()
+                        for topic in TOPICS for difficulty in DIFFICULTIES}
+        self._primed = deque()
+        self._wake = threading.Event()
+        self._closed = False
+        self.misses = 0
+
+        self._worker = threading.Thread(target=self._run, name='its-problem-pool', daemon=True)
+        self._worker.start()
+        self._wake.set()
+
+    def get(self, topic, difficulty):
+        """Next problem code for a topic, generated inline if the queue is empty"""
+        queue = self._queues[topic, difficulty]
+        with self._lock:
+            self._check_table()
+            code = queue.popleft() if queue else None
+        if code is None:
+            self.misses += 1
+            code = draw_problem_code(topic, difficulty, self._miss_rng)
+        if len(queue) < self.low_watermark:
+            self._wake.set()
+        return code
+
+    def prime(self, difficulty):
+        """Refill a difficulty ahead of the others, e.g. after a level change"""
+        self._primed.append(difficulty)
+        self._wake.set()
+
+    def size(self, topic, difficulty):
+        return len(self._queues[topic, difficulty])
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._worker.join()
+
+    def _check_table(self):
+        # Called with the lock held
+        version = item_table_version()
+        if version != self._version:
+            self._version = version
+            for queue in self._queues.values():
+                queue.clear()
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closed:
+                return
+            while self._primed:
+                self._refill(self._primed.popleft())
+            for difficulty in DIFFICULTIES:
+                self._refill(difficulty)
+
+    def _refill(self, difficulty):
+        for topic in TOPICS:
+            queue = self._queues[topic, difficulty]
+            if len(queue) >= self.low_watermark:
+                continue
+            while len(queue) < self.high_watermark and not self._closed:
+                version = item_table_version()
+                code = draw_problem_code(topic, difficulty, self.rng)
+                # Render once so the template LRU already holds the statement
+                problem_text(problem_from_code(code)[0])
+                with self._lock:
+                    self._check_table()
+                    # Drop a code drawn while a new table was being loaded
+                    if version == self._version:
+                        queue.append(code)
@@ -0,0 +1,78 @@
+"""Review queue shared by every student a process serves.
+
+Each StudentState keeps its own review schedule (see its_engine's REVIEW_*
+constants); ReviewQueue puts the due times of all of them into one min-heap
+so the next review due anywhere is found in O(log n), however many
+students there are. Rescheduling pushes a fresh entry and leaves the old one
+where it is: an entry only counts while it matches the latest due time for
+its (student, topic), stale ones are dropped when they reach the top, and
+the heap is rebuilt once they outnumber the live ones.
+
+SessionManager fills the queue from the stored snapshots on start-up and
+its engines keep it current as students answer.
+"""
+import heapq
+import time
+
+from its_engine import REVIEW_SLOTS
+
+
+class ReviewQueue:
+    """Min-heap of (due time, student_id, topic) over many students"""
+
+    def __init__(self, entries=()):
+        self._due = {}
+        for student_id, topic, due in entries:
+            if due:
+                self._due[student_id, topic] = due
+        self._heap = [(due, student_id, topic) for (student_id, topic), due in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._due)
+
+    def schedule(self, student_id, topic, due):
+        """Set when a student's topic is due for review; a due time of 0 removes it"""
+        key = (student_id, topic)
+        if self._due.get(key, 0.0) == due:
+            return
+        if due:
+            self._due[key] = due
+            heapq.heappush(self._heap, (due, student_id, topic))
+        else:
+            del self._due[key]
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(due, student_id, topic)
+                          for (student_id, topic), due in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def schedule_state(self, student_id, state):
+        """Enter every topic of a StudentState's review schedule"""
+        for topic, slot in REVIEW_SLOTS.items():
+            self.schedule(student_id, topic, state.reviews[slot])
+
+    def _top(self):
+        heap = self._heap
+        while heap and self._due.get(heap[0][1:]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def peek(self):
+        """(due time, student_id, topic) of the earliest review, or None"""
+        return self._top()
+
+    def due(self, limit=10, now=None):
+        """Up to `limit` overdue reviews, most overdue first, left in the queue"""
+        now = time.time() if now is None else now
+        taken = []
+        while len(taken) < limit:
+            top = self._top()
+            if top is None or top[0] > now:
+                break
+            entry = heapq.heappop(self._heap)
+            # Rescheduling back to an earlier time can leave two live copies
+            if not taken or entry != taken[-1]:
+                taken.append(entry)
+        for entry in taken:
+            heapq.heappush(self._heap, entry)
+        return taken
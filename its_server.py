@@ -0,0 +1,262 @@
+"""Local asyncio HTTP/JSON service for tutoring sessions.
+
+Routes (all bodies and responses are JSON):
+
+    POST /sessions/<id>/problem   {"subject": "geometry", "shape": "circle"}
+                                  {"subject": "algebra", "difficulty": "advanced"}
+                                  (shape defaults to the one most overdue for review,
+                                  difficulty to the student's mastery level)
+    POST /sessions/<id>/answer    {"subject": "geometry", "answer": "78.54"}
+    GET  /sessions/<id>/hint?subject=geometry|algebra
+    GET  /sessions/<id>/progress
+    GET  /reviews?limit=10        most overdue reviews across all students
+
+Grading and generation are microsecond CPU work done inline; the only disk
+access, loading an evicted student's snapshot, runs in the default executor
+and progress writes go through the store's background queue, so nothing
+blocks the event loop.
+
+Run with:  python its_server.py --port 8765 [--db progress.db] [--bkt-params bkt.json]
+           [--item-table items.json]
+"""
+import argparse
+import asyncio
+import json
+import time
+import traceback
+from urllib.parse import parse_qs, urlsplit
+
+from its_engine import DIFFICULTIES, SHAPES, load_bkt_params, load_item_table
+from its_pool import ProblemPool
+from its_sessions import SessionManager
+from its_store import ProgressStore
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class TutoringServer:
+    """Serves SessionManager sessions over HTTP/1.1 with keep-alive"""
+
+    def __init__(self, manager, max_idle=1800):
+        self.manager = manager
+        self.max_idle = max_idle
+        self._connections = {}   # writer -> handler task
+
+    async def start(self, host='127.0.0.1', port=8765):
+        self._server = await asyncio.start_server(self.handle, host, port)
+        self._reaper = asyncio.ensure_future(self._evict_idle_sessions())
+        return self._server
+
+    async def close(self):
+        self._reaper.cancel()
+        self._server.close()
+        # Close idle keep-alive connections and let their handlers finish
+        for writer in list(self._connections):
+            writer.close()
+        await asyncio.gather(*self._connections.values(), return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _evict_idle_sessions(self):
+        while True:
+            await asyncio.sleep(min(60, self.max_idle))
+            self.manager.evict_idle(self.max_idle)
+
+    async def handle(self, reader, writer):
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+
+                try:
+                    status, payload = 200, await self.dispatch(method, target, body)
+                except RequestError as error:
+                    status, payload = error.status, {'error': str(error)}
+                except Exception:
+                    traceback.print_exc()
+                    status, payload = 500, {'error': "Internal server error"}
+
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                data = json.dumps(payload).encode('utf-8')
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                             f"\r\n".encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = url.path.strip('/').split('/')
+        if parts == ['reviews']:
+            if method != 'GET':
+                raise RequestError(405, f"{method} not allowed on reviews")
+            return self.reviews(parse_qs(url.query))
+        if len(parts) != 3 or parts[0] != 'sessions' or not parts[1]:
+            raise RequestError(404, f"No route for {url.path}")
+        student_id, action = parts[1], parts[2]
+
+        routes = {
+            ('POST', 'problem'): self.new_problem,
+            ('POST', 'answer'): self.submit_answer,
+            ('GET', 'hint'): self.hint,
+            ('GET', 'progress'): self.progress,
+        }
+        handler = routes.get((method, action))
+        if handler is None:
+            if action in ('problem', 'answer', 'hint', 'progress'):
+                raise RequestError(405, f"{method} not allowed on {action}")
+            raise RequestError(404, f"No route for {url.path}")
+
+        if body:
+            try:
+                params = json.loads(body)
+            except ValueError:
+                raise RequestError(400, "Body must be JSON")
+        else:
+            params = {}
+        if not isinstance(params, dict):
+            raise RequestError(400, "Body must be a JSON object")
+        for name, values in parse_qs(url.query).items():
+            params.setdefault(name, values[-1])
+
+        engine = await self.session(student_id)
+        return handler(engine, params)
+
+    async def session(self, student_id):
+        manager = self.manager
+        if student_id not in manager and manager.store is not None:
+            # Rehydrating reads SQLite, so keep it off the event loop
+            loop = asyncio.get_running_loop()
+            snapshot = await loop.run_in_executor(None, manager.store.load_progress, student_id)
+            if student_id not in manager:
+                manager.admit(student_id, snapshot)
+        return manager.session(student_id)
+
+    @staticmethod
+    def _subject(params):
+        subject = params.get('subject')
+        if subject not in ('geometry', 'algebra'):
+            raise RequestError(400, "subject must be 'geometry' or 'algebra'")
+        return subject
+
+    def new_problem(self, engine, params):
+        if self._subject(params) == 'geometry':
+            # Without a shape, the engine serves a due review (or a triangle)
+            shape = params.get('shape') or None
+            if shape is not None and shape not in SHAPES:
+                raise RequestError(400, f"shape must be one of {', '.join(SHAPES)}")
+            return engine.generate_geometry_problem(shape)
+
+        # Without an explicit difficulty, serve the one the student's mastery calls for
+        difficulty = params.get('difficulty') or None
+        if difficulty is not None and difficulty not in DIFFICULTIES:
+            raise RequestError(400, f"difficulty must be one of {', '.join(DIFFICULTIES)}")
+        return engine.generate_algebra_problem(difficulty)
+
+    def submit_answer(self, engine, params):
+        subject = self._subject(params)
+        if engine.current(subject)[0] is None:
+            raise RequestError(400, f"No {subject} problem has been generated for this session")
+        answer = str(params.get('answer', ''))
+        if subject == 'geometry':
+            return engine.check_geometry_answer(answer)
+        return engine.check_algebra_answer(answer)
+
+    def hint(self, engine, params):
+        subject = self._subject(params)
+        if engine.current(subject)[0] is None:
+            raise RequestError(400, f"No {subject} problem has been generated for this session")
+        if subject == 'geometry':
+            return {'hint': engine.get_geometry_hint()}
+        return {'steps': engine.get_algebra_explanation()}
+
+    def progress(self, engine, params):
+        snapshot = engine.progress_snapshot()
+        del snapshot['current']
+        return {'progress': snapshot,
+                'recommendations': engine.get_learning_recommendations(),
+                'report': engine.progress_report()}
+
+    def reviews(self, query):
+        try:
+            limit = int(query.get('limit', ['10'])[-1])
+        except ValueError:
+            raise RequestError(400, "limit must be a whole number")
+        now = time.time()
+        return {'reviews': [{'student_id': student_id, 'topic': topic, 'due': due,
+                             'overdue_seconds': round(now - due, 1)}
+                            for due, student_id, topic in self.manager.reviews.due(limit, now)]}
+
+
+async def serve(host, port, db=None, capacity=10000, seed=None):
+    store = ProgressStore(db) if db else None
+    # A seeded session draws from its stream and never uses a pool
+    pool = ProblemPool() if seed is None else None
+    manager = SessionManager(store, capacity=capacity, pool=pool, seed=seed)
+    server = TutoringServer(manager)
+    await server.start(host, port)
+    print(f"Serving tutoring sessions on http://{host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        manager.close()
+        if pool is not None:
+            pool.close()
+        if store is not None:
+            store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve tutoring sessions as a local JSON API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--db', help="SQLite progress database (default: in-memory sessions only)")
+    parser.add_argument('--capacity', type=int, default=10000,
+                        help="Active students kept in memory before LRU eviction")
+    parser.add_argument('--seed', type=int,
+                        help="Give every student a reproducible problem sequence derived from this")
+    parser.add_argument('--bkt-params', help="Mastery-model parameters fitted by its_bkt.py")
+    parser.add_argument('--item-table', help="Draw problems by difficulty calibrated by its_irt.py")
+    args = parser.parse_args()
+    if args.bkt_params:
+        load_bkt_params(args.bkt_params)
+    if args.item_table:
+        load_item_table(args.item_table)
+    try:
+        asyncio.run(serve(args.host, args.port, args.db, args.capacity, args.seed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
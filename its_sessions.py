@@ -0,0 +1,104 @@
+"""Many concurrent learners per process.
+
+SessionManager keeps one compact StudentState per active student in an LRU
+order. When more than `capacity` students are active, or a student has been
+idle for too long, their state is written to the progress store and dropped
+from memory; the next request for that student rehydrates it from the
+latest snapshot.
+
+`reviews` is an its_review.ReviewQueue of the review due times of every
+student in the store, active or not, filled from the snapshots on start-up.
+"""
+import random
+import time
+from collections import OrderedDict
+
+from its_engine import ReportCache, StudentState, TutoringEngine, derive_seed
+from its_review import ReviewQueue
+
+
+class SessionManager:
+    """LRU cache of StudentStates backed by an optional ProgressStore"""
+
+    def __init__(self, store=None, capacity=10000, rng=None, pool=None, seed=None):
+        self.store = store
+        self.pool = pool
+        # With a seed every student gets a reproducible stream derived from it
+        self.seed = seed
+        self.capacity = capacity
+        self.rng = rng if rng is not None else random.Random()
+        self._states = OrderedDict()   # student_id -> StudentState, least recent first
+        # Rendered progress reports of the most recent students, outside their states
+        self.reports = ReportCache()
+        self.reviews = ReviewQueue(store.iter_reviews() if store is not None else ())
+
+    def __len__(self):
+        return len(self._states)
+
+    def __contains__(self, student_id):
+        return student_id in self._states
+
+    def state(self, student_id):
+        """Active state for a student, rehydrating or creating it as needed"""
+        state = self._states.get(student_id)
+        if state is not None:
+            self._states.move_to_end(student_id)
+            state.last_seen = time.monotonic()
+            return state
+
+        snapshot = self.store.load_progress(student_id) if self.store is not None else None
+        return self.admit(student_id, snapshot)
+
+    def admit(self, student_id, snapshot=None):
+        """Make a student active from an already-loaded snapshot (or afresh).
+
+        Lets async callers do the store read off the event loop themselves.
+        """
+        state = StudentState.from_snapshot(snapshot) if snapshot is not None else StudentState()
+        self._states[student_id] = state
+        self.reviews.schedule_state(student_id, state)
+        self._states.move_to_end(student_id)
+        if len(self._states) > self.capacity:
+            self.evict(next(iter(self._states)))
+        state.last_seen = time.monotonic()
+        return state
+
+    def session(self, student_id):
+        """A TutoringEngine over the student's state; cheap enough to make per request"""
+        seed = derive_seed(self.seed, student_id) if self.seed is not None else None
+        return TutoringEngine(rng=self.rng, store=self.store, student_id=student_id,
+                              state=self.state(student_id), pool=self.pool, seed=seed,
+                              reviews=self.reviews, reports=self.reports)
+
+    def evict(self, student_id):
+        """Persist a student's state and drop it from memory"""
+        state = self._states.pop(student_id, None)
+        if state is not None and self.store is not None:
+            self.store.save_snapshot(student_id, state.snapshot())
+
+    def evict_idle(self, max_idle):
+        """Evict every student idle for more than max_idle seconds"""
+        cutoff = time.monotonic() - max_idle
+        evicted = 0
+        # Access order is LRU order, so stop at the first recent student
+        while self._states:
+            student_id, state = next(iter(self._states.items()))
+            if state.last_seen > cutoff:
+                break
+            self.evict(student_id)
+            evicted += 1
+        return evicted
+
+    def close(self):
+        """Persist every active state"""
+        for student_id in list(self._states):
+            self.evict(student_id)
+
+    def memory_per_session(self):
+        """Mean bytes held per active student, including the LRU slot"""
+        if not self._states:
+            return 0
+        # Rough per-entry cost of the OrderedDict slot plus the key string
+        total = sum(state.footprint() + 100 for state in self._states.values())
+        total += sum(len(student_id) + 49 for student_id in self._states)
+        return total / len(self._states)
@@ -0,0 +1,303 @@
+"""Simulated students for comparing difficulty-adaptation policies.
+
+Each simulated learner has hidden knowledge of every (topic, difficulty)
+and answers from it with slip and guess noise, learning as they practise.
+Problems come from the real engine: a policy picks the difficulty, the
+engine draws the problem, and the learner's answer is typed into the same
+checker the GUI uses, so mastery tracking, grading and feedback all run
+exactly as for a real student.
+
+For every policy the run reports:
+
+  convergence  attempts on a topic between the learner becoming ready for
+               a new difficulty (or starting out) and the policy serving it
+  on target    share of attempts served at the learner's target difficulty,
+               the easiest one they do not know yet
+  oscillation  difficulty changes, and reversals of direction, per 100
+               attempts on a topic
+  throughput   simulated attempts per second over all workers
+
+Students are split over a process pool. Learner i of a run is built from
+derive_seed(seed, 'learner', i), so every policy faces the same students.
+
+    python its_simulate.py --students 20000 --attempts 100 -j 8 \\
+        --policy mastery --policy threshold --skills 0.5,quadratic_equations=0.3
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import time
+
+from its_engine import DIFFICULTIES, SHAPES, TOPICS, TutoringEngine, derive_seed
+
+STUDENTS_PER_TASK = 100
+
+
+class Learner:
+    """Hidden knowledge of one simulated student.
+
+    A level (topic, difficulty) starts known with probability
+    skill ** (level + 1), so harder levels are rarer. Each attempt at an
+    unknown level teaches it with probability `learn`, or a third of that
+    while the level below is still unknown. Known levels are answered
+    correctly with probability 1 - slip, unknown ones with probability guess.
+    """
+
+    def __init__(self, skills, learn, slip, guess, rng):
+        self.learn = learn
+        self.slip = slip
+        self.guess = guess
+        self.rng = rng
+        self.known = {topic: [rng.random() < skills[topic] ** (level + 1)
+                              for level in range(len(DIFFICULTIES))] for topic in TOPICS}
+
+    def target(self, topic):
+        """Level the learner should practise: the easiest one not yet known"""
+        known = self.known[topic]
+        for level, is_known in enumerate(known):
+            if not is_known:
+                return level
+        return len(known) - 1
+
+    def attempt(self, topic, level):
+        """Answer one problem; True if the learner gets it right"""
+        known = self.known[topic]
+        correct = self.rng.random() < (1 - self.slip if known[level] else self.guess)
+        if not known[level]:
+            learn = self.learn if level == 0 or known[level - 1] else self.learn / 3
+            known[level] = self.rng.random() < learn
+        return correct
+
+
+def answer_text(answer, correct, rng):
+    """What the learner types: the answer, or a plausible mistake"""
+    if isinstance(answer, list):
+        if not correct:
+            answer = [answer[0] + rng.choice((-1, 1))] + answer[1:]
+        return ', '.join(str(root) for root in answer)
+    if not correct:
+        # A forgotten 1/2 or a doubled term, off by one
+        answer = round(answer * rng.choice((0.5, 2)) + rng.choice((-1, 1)), 2)
+    return str(answer)
+
+
+class MasteryPolicy:
+    """The engine's own rule: per-topic BKT mastery"""
+
+    def difficulty(self, engine, topic):
+        return engine.skill_difficulty(topic)
+
+    def observe(self, engine, topic, correct):
+        pass
+
+
+class ThresholdPolicy:
+    """The original desktop app's rule, step for step.
+
+    One level, used for every shape, moves on the mean of the lifetime
+    geometry and algebra success rates, and only after a geometry answer.
+    The original took the rates after counting a correct answer but before
+    counting the attempt, so the geometry total here is one short. Algebra
+    difficulty was a radio button the rule never touched, left at its
+    default, beginner.
+    """
+
+    def __init__(self):
+        self.level = 0
+
+    def difficulty(self, engine, topic):
+        return DIFFICULTIES[self.level if topic in SHAPES else 0]
+
+    def observe(self, engine, topic, correct):
+        if topic not in SHAPES:
+            return
+        stats = engine.state.stats
+        geometry_rate = stats.correct('geometry') / max(1, stats.total('geometry') - 1)
+        rate = (geometry_rate + stats.rate('algebra')) / 2
+        if correct:
+            if rate > 0.8 and self.level == 0:
+                self.level = 1
+            elif rate > 0.85 and self.level == 1:
+                self.level = 2
+        elif stats.total_attempts() - 1 >= 5:
+            if rate < 0.5 and self.level == 2:
+                self.level = 1
+            elif rate < 0.4 and self.level == 1:
+                self.level = 0
+
+
+POLICIES = {'mastery': MasteryPolicy, 'threshold': ThresholdPolicy}
+
+
+class SimulationStats:
+    """Counters for one policy, merged across workers"""
+
+    FIELDS = ('students', 'attempts', 'correct', 'on_target', 'too_hard', 'too_easy',
+              'changes', 'reversals', 'lag_attempts', 'lags', 'unconverged', 'mismatches',
+              'finished')
+
+    def __init__(self):
+        for name in self.FIELDS:
+            setattr(self, name, 0)
+
+    def merge(self, other):
+        for name in self.FIELDS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def report(self, seconds):
+        attempts = max(1, self.attempts)
+        return {
+            'students': self.students,
+            'attempts': self.attempts,
+            'success_rate': round(self.correct / attempts, 4),
+            'on_target': round(self.on_target / attempts, 4),
+            'too_hard': round(self.too_hard / attempts, 4),
+            'too_easy': round(self.too_easy / attempts, 4),
+            'convergence_attempts': round(self.lag_attempts / max(1, self.lags), 2),
+            'unconverged': self.unconverged,
+            'changes_per_100': round(100 * self.changes / attempts, 2),
+            'reversals_per_100': round(100 * self.reversals / attempts, 2),
+            'finished_students': round(self.finished / max(1, self.students), 4),
+            'grading_mismatches': self.mismatches,
+            'attempts_per_second': round(self.attempts / seconds) if seconds else None,
+        }
+
+
+def simulate_student(policy_name, config, seed, index, attempts, stats):
+    """Run one learner for `attempts` problems, adding to `stats`"""
+    rng = random.Random(derive_seed(seed, 'learner', index))
+    learner = Learner(config['skills'], config['learn'], config['slip'], config['guess'], rng)
+    engine = TutoringEngine(rng=random.Random(derive_seed(seed, 'engine', index)))
+    policy = POLICIES[policy_name]()
+
+    served = {topic: None for topic in TOPICS}
+    direction = {topic: 0 for topic in TOPICS}
+    # Attempt number on the topic from which the policy has been lagging the learner
+    lagging = {topic: None for topic in TOPICS}
+    seen = {topic: 0 for topic in TOPICS}
+
+    for _ in range(attempts):
+        topic = rng.choice(TOPICS)
+        difficulty = policy.difficulty(engine, topic)
+        level = DIFFICULTIES.index(difficulty)
+        target = learner.target(topic)
+
+        if seen[topic] == 0 and level != target:
+            lagging[topic] = 0
+        if lagging[topic] is not None and level == target:
+            stats.lag_attempts += seen[topic] - lagging[topic]
+            stats.lags += 1
+            lagging[topic] = None
+        previous = served[topic]
+        if previous is not None and level != previous:
+            stats.changes += 1
+            step = 1 if level > previous else -1
+            if direction[topic] == -step:
+                stats.reversals += 1
+            direction[topic] = step
+        served[topic] = level
+        stats.on_target += level == target
+        stats.too_hard += level > target
+        stats.too_easy += level < target
+
+        intended = learner.attempt(topic, level)
+        if topic in SHAPES:
+            engine.state.geometry = engine.draw_code(topic, difficulty)
+            answer = engine.current('geometry')[1]
+            result = engine.check_geometry_answer(answer_text(answer, intended, rng))
+        else:
+            engine.state.algebra = engine.draw_code('quadratic', difficulty)
+            answer = engine.current('algebra')[1]
+            result = engine.check_algebra_answer(answer_text(answer, intended, rng))
+        policy.observe(engine, topic, result['correct'])
+
+        stats.attempts += 1
+        stats.correct += result['correct']
+        stats.mismatches += result['correct'] != intended
+        seen[topic] += 1
+        new_target = learner.target(topic)
+        if new_target != target and level != new_target and lagging[topic] is None:
+            lagging[topic] = seen[topic]
+
+    stats.students += 1
+    stats.unconverged += sum(1 for since in lagging.values() if since is not None)
+    stats.finished += all(all(known) for known in learner.known.values())
+
+
+def simulate_range(policy_name, config, seed, start, stop, attempts):
+    stats = SimulationStats()
+    for index in range(start, stop):
+        simulate_student(policy_name, config, seed, index, attempts, stats)
+    return stats
+
+
+def simulate(policy_name, config, students, attempts, seed=0, processes=1):
+    """Simulate `students` learners under a policy; returns (stats, seconds)"""
+    tasks = [(policy_name, config, seed, start, min(start + STUDENTS_PER_TASK, students), attempts)
+             for start in range(0, students, STUDENTS_PER_TASK)]
+    started = time.perf_counter()
+    stats = SimulationStats()
+    if processes <= 1:
+        for task in tasks:
+            stats.merge(simulate_range(*task))
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            for part in pool.starmap(simulate_range, tasks):
+                stats.merge(part)
+    return stats, time.perf_counter() - started
+
+
+def parse_skills(text):
+    """'0.5,circle=0.3' -> a skill per topic (0.5 unless given)"""
+    default = 0.5
+    named = {}
+    for part in filter(None, (part.strip() for part in text.split(','))):
+        topic, _, value = part.rpartition('=')
+        if not topic:
+            default = float(value)
+        elif topic in TOPICS:
+            named[topic] = float(value)
+        else:
+            raise ValueError(f"Unknown topic: {topic}")
+    return {topic: named.get(topic, default) for topic in TOPICS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare adaptation policies on simulated students")
+    parser.add_argument('--policy', action='append', choices=sorted(POLICIES),
+                        help="Policy to simulate; repeat to compare (default: all)")
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--attempts', type=int, default=100, help="Attempts per student")
+    parser.add_argument('--skills', default='0.5',
+                        help="Prior knowledge, e.g. 0.5 or 0.4,circle=0.8,quadratic_equations=0.2")
+    parser.add_argument('--learn', type=float, default=0.1, help="Chance an attempt teaches a level")
+    parser.add_argument('--slip', type=float, default=0.1)
+    parser.add_argument('--guess', type=float, default=0.15)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="Worker processes")
+    parser.add_argument('--json', action='store_true', help="Print the reports as JSON")
+    args = parser.parse_args()
+
+    try:
+        skills = parse_skills(args.skills)
+    except ValueError as error:
+        parser.error(str(error))
+    config = {'skills': skills, 'learn': args.learn, 'slip': args.slip, 'guess': args.guess}
+
+    reports = {}
+    for policy_name in args.policy or sorted(POLICIES):
+        stats, seconds = simulate(policy_name, config, args.students, args.attempts,
+                                  args.seed, args.jobs)
+        reports[policy_name] = stats.report(seconds)
+        if not args.json:
+            print(f"{policy_name}:")
+            for name, value in reports[policy_name].items():
+                print(f"  {name:22} {value}")
+    if args.json:
+        print(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    main()
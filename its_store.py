@@ -0,0 +1,215 @@
+"""Durable student progress: an append-only attempt log plus snapshots.
+
+Progress lives in a SQLite database in WAL mode. Callers only put records
+on a queue; a background writer thread drains it in batches, so grading an
+answer never waits on the disk. Every batch also upserts the latest progress
+snapshot of each student it touched, so startup restores a student with a
+single row read instead of replaying the attempt history. Snapshots still
+waiting in the queue are answered from memory, so a student evicted and
+reloaded straight away never comes back with older progress.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+
+DEFAULT_PATH = os.environ.get('ITS_PROGRESS_DB',
+                              os.path.join(os.path.expanduser('~'), '.its_progress.db'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    student_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    subject TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    item TEXT
+);
+CREATE INDEX IF NOT EXISTS attempts_student ON attempts (student_id, id);
+CREATE TABLE IF NOT EXISTS snapshots (
+    student_id TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    progress TEXT NOT NULL
+);
+"""
+
+_STOP = object()
+
+
+class ProgressStore:
+    """Asynchronous, batched writer and fast reader for student progress"""
+
+    def __init__(self, path=DEFAULT_PATH, batch_size=512, flush_interval=0.2):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue()
+        # student_id -> newest snapshot queued but not yet written
+        self._unwritten = {}
+        self._unwritten_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._reader = self._connect(check_same_thread=False)
+        self._reader.executescript(SCHEMA)
+        columns = [row[1] for row in self._reader.execute('PRAGMA table_info(attempts)')]
+        if 'item' not in columns:
+            # Databases from before attempts recorded which problem was asked
+            with self._reader:
+                self._reader.execute('ALTER TABLE attempts ADD COLUMN item TEXT')
+
+        self._writer = threading.Thread(target=self._run, name='its-progress-writer', daemon=True)
+        self._writer.start()
+        self._closed = False
+
+    def _connect(self, **kwargs):
+        conn = sqlite3.connect(self.path, **kwargs)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def record_attempt(self, student_id, subject, topic, difficulty, correct, snapshot=None,
+                       item=None):
+        """Queue one attempt (and optionally the progress snapshot after it).
+
+        `item` is the problem code that was answered, kept for its_irt.
+        """
+        if snapshot is not None:
+            self._hold(student_id, snapshot)
+        self._queue.put((student_id, time.time(), subject, topic, difficulty, int(correct),
+                         item, snapshot))
+
+    def save_snapshot(self, student_id, snapshot):
+        """Queue a progress snapshot without logging an attempt"""
+        self._hold(student_id, snapshot)
+        self._queue.put((student_id, time.time(), None, None, None, None, None, snapshot))
+
+    def _hold(self, student_id, snapshot):
+        with self._unwritten_lock:
+            self._unwritten[student_id] = snapshot
+
+    def load_progress(self, student_id):
+        """Latest snapshot for a student, or None if they have never been saved"""
+        with self._unwritten_lock:
+            snapshot = self._unwritten.get(student_id)
+        if snapshot is not None:
+            # A copy in the form a database read returns
+            return json.loads(json.dumps(snapshot))
+        with self._read_lock:
+            row = self._reader.execute(
+                'SELECT progress FROM snapshots WHERE student_id = ?', (student_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_attempts(self, student_id=None, batch_size=10000):
+        """Yield (student_id, ts, subject, topic, difficulty, correct) in log order"""
+        conn = self._connect()
+        try:
+            if student_id is None:
+                cursor = conn.execute('SELECT student_id, ts, subject, topic, difficulty, correct '
+                                      'FROM attempts ORDER BY id')
+            else:
+                cursor = conn.execute('SELECT student_id, ts, subject, topic, difficulty, correct '
+                                      'FROM attempts WHERE student_id = ? ORDER BY id', (student_id,))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def iter_items(self, batch_size=10000):
+        """Yield (student_id, problem code, correct) for attempts that logged their item"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute('SELECT student_id, item, correct FROM attempts '
+                                  'WHERE item IS NOT NULL ORDER BY id')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for student_id, item, correct in rows:
+                    yield student_id, tuple(json.loads(item)), correct
+        finally:
+            conn.close()
+
+    def iter_reviews(self, batch_size=10000):
+        """Yield (student_id, topic, due time) for the reviews in every stored snapshot"""
+        conn = self._connect()
+        try:
+            # Only the small 'reviews' object is pulled out of each snapshot
+            cursor = conn.execute("SELECT student_id, json_extract(progress, '$.reviews') "
+                                  "FROM snapshots WHERE json_extract(progress, '$.reviews') != '{}'")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for student_id, reviews in rows:
+                    for topic, (due, _interval) in json.loads(reviews).items():
+                        yield student_id, topic, due
+        finally:
+            conn.close()
+
+    def flush(self):
+        """Block until everything queued so far is on disk"""
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._reader.close()
+
+    def _run(self):
+        conn = self._connect()
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            if batch[-1] is _STOP:
+                stop = True
+            try:
+                self._write(conn, [item for item in batch if item is not _STOP])
+            except sqlite3.Error:
+                traceback.print_exc()
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def _write(self, conn, batch):
+        attempts = []
+        snapshots = {}
+        for student_id, ts, subject, topic, difficulty, correct, item, snapshot in batch:
+            if subject is not None:
+                attempts.append((student_id, ts, subject, topic, difficulty, correct,
+                                 json.dumps(item) if item is not None else None))
+            if snapshot is not None:
+                # Only the newest snapshot per student in a batch is kept
+                snapshots[student_id] = (student_id, ts, snapshot)
+
+        with conn:
+            conn.executemany('INSERT INTO attempts (student_id, ts, subject, topic, difficulty, correct, '
+                             'item) VALUES (?, ?, ?, ?, ?, ?, ?)', attempts)
+            conn.executemany('INSERT OR REPLACE INTO snapshots (student_id, ts, progress) VALUES (?, ?, ?)',
+                             [(sid, ts, json.dumps(snapshot)) for sid, ts, snapshot in snapshots.values()])
+        with self._unwritten_lock:
+            for student_id, _, snapshot in snapshots.values():
+                # A newer snapshot may have been queued while this batch was written
+                if self._unwritten.get(student_id) is snapshot:
+                    del self._unwritten[student_id]
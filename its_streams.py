@@ -0,0 +1,73 @@
+"""Reproducible problem sets, generated serially or across processes.
+
+Problem i of a set is problem_code_at(seed, i, topic, difficulty): it is
+drawn from its own CounterRandom stream, so it depends on the seed and its
+index and nothing else. Worker k of n generates the slice shard(count, n, k)
+and the concatenated result is identical to a serial run, whatever n is.
+
+    python its_streams.py --seed 42 --topic circle --difficulty beginner \\
+        --count 100000 -j 8 -o problems.jsonl
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+
+from its_engine import DIFFICULTIES, SHAPES, problem_code_at, problem_from_code
+
+TOPICS = SHAPES + ['quadratic']
+
+
+def shard(count, workers, worker):
+    """Indices of the contiguous slice of `count` items owned by `worker` of `workers`"""
+    return range(count * worker // workers, count * (worker + 1) // workers)
+
+
+def generate_range(seed, topic, difficulty, start, stop):
+    """Problem codes for indices start..stop-1 of a set"""
+    return [problem_code_at(seed, index, topic, difficulty) for index in range(start, stop)]
+
+
+def generate_problem_set(seed, topic, difficulty, count, processes=1):
+    """Problem codes 0..count-1, split over `processes` worker processes"""
+    if processes <= 1:
+        return generate_range(seed, topic, difficulty, 0, count)
+    tasks = [(seed, topic, difficulty, part.start, part.stop)
+             for part in (shard(count, processes, k) for k in range(processes))]
+    with multiprocessing.Pool(processes) as pool:
+        parts = pool.starmap(generate_range, tasks)
+    return [code for part in parts for code in part]
+
+
+def iter_problems(seed, topic, difficulty, start=0, stop=None):
+    """Yield (index, problem, answer) from `start`, forever if stop is None"""
+    index = start
+    while stop is None or index < stop:
+        problem, answer = problem_from_code(problem_code_at(seed, index, topic, difficulty))
+        yield index, problem, answer
+        index += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a reproducible problem set")
+    parser.add_argument('--seed', type=int, required=True)
+    parser.add_argument('--topic', choices=TOPICS, required=True)
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='beginner')
+    parser.add_argument('--count', type=int, default=100)
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="Worker processes")
+    parser.add_argument('-o', '--output', help="JSONL file (default: stdout)")
+    args = parser.parse_args()
+
+    codes = generate_problem_set(args.seed, args.topic, args.difficulty, args.count, args.jobs)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for index, code in enumerate(codes):
+            problem, answer = problem_from_code(code)
+            out.write(json.dumps({'index': index, 'problem': problem, 'answer': answer}) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
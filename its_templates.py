@@ -0,0 +1,178 @@
+"""Text templates for problem statements, hints and worked solutions.
+
+Every (problem kind, output) pair has one template, written once at import
+time and stored as a bound str.format in the TEMPLATES dispatch table, so
+rendering is a single format call instead of a chain of if/elif branches
+and += concatenation. Rendered text is cached by problem parameters in a
+bounded LRU, which makes repeated hints, steps and bulk exports of the same
+items essentially free.
+"""
+import math
+from functools import lru_cache
+
+# Outputs a problem can be rendered as
+STATEMENT, HINT, STEPS = 'statement', 'hint', 'steps'
+
+RENDER_CACHE_SIZE = 8192
+
+_QUADRATIC_FORMULA = "x = (-b ± √(b² - 4ac)) / (2a)"
+
+_QUADRATIC_STEPS_HEADER = f"""Step-by-step solution using the quadratic formula:
+
+Given: {{equation}}
+Where a = {{a}}, b = {{b}}, c = {{c}}
+
+Quadratic formula: {_QUADRATIC_FORMULA}
+
+Calculate discriminant: b² - 4ac = {{b}}² - 4({{a}})({{c}}) = {{discriminant}}
+
+"""
+
+_TEMPLATE_TEXT = {
+    ('triangle', STATEMENT): """ TRIANGLE AREA PROBLEM
+
+Find the area of a triangle with:
+• Base = {base} units
+• Height = {height} units
+
+Formula: Area = (1/2) × base × height
+
+Remember to substitute the values into the formula and calculate carefully.
+Round your answer to 2 decimal places if necessary.
+        """,
+    ('square', STATEMENT): """ SQUARE AREA PROBLEM
+
+Find the area of a square with:
+• Side length = {side} units
+
+Formula: Area = side²
+
+Calculate the area by squaring the side length.
+        """,
+    ('rectangle', STATEMENT): """▭ RECTANGLE AREA PROBLEM
+
+Find the area of a rectangle with:
+• Length = {length} units
+• Width = {width} units
+
+Formula: Area = length × width
+
+Multiply the length and width to find the area.
+        """,
+    ('circle', STATEMENT): """ CIRCLE AREA PROBLEM
+
+Find the area of a circle with:
+• Radius = {radius} units
+
+Formula: Area = π × radius²
+
+Use π ≈ 3.14159 for your calculation.
+Round your answer to 2 decimal places.
+        """,
+    ('quadratic_beginner', STATEMENT): """ QUADRATIC EQUATION PROBLEM (Beginner)
+
+Solve the quadratic equation:
+{equation}
+
+This equation can be solved by factoring or using the quadratic formula.
+
+Enter your solutions separated by commas (e.g., 2, -3)
+Order doesn't matter.
+        """,
+    ('quadratic_intermediate', STATEMENT): f""" QUADRATIC EQUATION PROBLEM (Intermediate)
+
+Solve the quadratic equation:
+{{equation}}
+
+Use the quadratic formula: {_QUADRATIC_FORMULA}
+Where a = {{a}}, b = {{b}}, c = {{c}}
+
+Enter your solutions separated by commas, rounded to 2 decimal places.
+        """,
+    ('quadratic_advanced', STATEMENT): """ QUADRATIC EQUATION PROBLEM (Advanced)
+
+Solve the quadratic equation:
+{equation}
+
+This may require careful application of the quadratic formula.
+Consider whether the equation can be factored or if you need to use the formula.
+
+Enter your solutions separated by commas, rounded to 2 decimal places.
+        """,
+
+    ('triangle', HINT): " Hint: Use the formula Area = (1/2) × base × height\nSubstitute: base = {base}, height = {height}",
+    ('square', HINT): " Hint: Use the formula Area = side²\nSubstitute: side = {side}",
+    ('rectangle', HINT): " Hint: Use the formula Area = length × width\nSubstitute: length = {length}, width = {width}",
+    ('circle', HINT): " Hint: Use the formula Area = π × radius²\nSubstitute: radius = {radius}, π ≈ 3.14159",
+
+    ('triangle', STEPS): "Step-by-step solution:\nArea = (1/2) × base × height\nArea = (1/2) × {base} × {height}\nArea = {answer}",
+    ('square', STEPS): "Step-by-step solution:\nArea = side²\nArea = {side}²\nArea = {answer}",
+    ('rectangle', STEPS): "Step-by-step solution:\nArea = length × width\nArea = {length} × {width}\nArea = {answer}",
+    ('circle', STEPS): "Step-by-step solution:\nArea = π × radius²\nArea = π × {radius}²\nArea = π × {radius_squared}\nArea = {answer}",
+    ('quadratic_two_roots', STEPS): _QUADRATIC_STEPS_HEADER + (
+        "x = (-{b} ± √{discriminant}) / (2×{a})\n"
+        "x = ({neg_b} ± {sqrt_disc:.2f}) / {two_a}\n\n"
+        "x₁ = ({neg_b} + {sqrt_disc:.2f}) / {two_a} = {x1:.2f}\n"
+        "x₂ = ({neg_b} - {sqrt_disc:.2f}) / {two_a} = {x2:.2f}"),
+    ('quadratic_one_root', STEPS): _QUADRATIC_STEPS_HEADER + (
+        "x = -{b} / (2×{a}) = {x:.2f}\n"
+        "This equation has one repeated solution."),
+    ('quadratic_no_roots', STEPS): _QUADRATIC_STEPS_HEADER,
+}
+
+# (template id, output) -> bound str.format
+TEMPLATES = {key: text.format for key, text in _TEMPLATE_TEXT.items()}
+
+
+def _quadratic_fields(fields):
+    a, b, c = fields['a'], fields['b'], fields['c']
+    discriminant = b*b - 4*a*c
+    fields['discriminant'] = discriminant
+    fields['neg_b'] = -b
+    fields['two_a'] = 2*a
+    if discriminant > 0:
+        sqrt_disc = math.sqrt(discriminant)
+        fields['sqrt_disc'] = sqrt_disc
+        fields['x1'] = (-b + sqrt_disc) / (2*a)
+        fields['x2'] = (-b - sqrt_disc) / (2*a)
+        return 'quadratic_two_roots'
+    elif discriminant == 0:
+        fields['x'] = -b / (2*a)
+        return 'quadratic_one_root'
+    return 'quadratic_no_roots'
+
+
+def _template_id(fields, output):
+    """Pick the template variant and add any derived fields it needs"""
+    kind = fields['type']
+    if kind != 'quadratic':
+        if kind == 'circle':
+            fields['radius_squared'] = fields['radius'] ** 2
+        return kind
+    if output == STATEMENT:
+        return f"quadratic_{fields['difficulty']}"
+    return _quadratic_fields(fields)
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render(output, items, answer):
+    fields = dict(items)
+    fields['answer'] = answer
+    return TEMPLATES[_template_id(fields, output), output](**fields)
+
+
+def render(problem, output, answer=None):
+    """Render a problem dict as a statement, hint or steps text.
+
+    `answer` is only used by geometry steps. Results are cached by the
+    problem's parameters.
+    """
+    return _render(output, tuple(problem.items()), answer)
+
+
+def cache_info():
+    return _render.cache_info()
+
+
+def cache_clear():
+    _render.cache_clear()
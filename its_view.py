@@ -0,0 +1,76 @@
+"""Coalesced, diff-based writes to read-only Tk text widgets.
+
+A handler often writes several widgets, or the same widget twice, while
+handling one event. TextUpdates only records the latest text per widget and
+applies everything in a single after_idle pass, once the handler has
+returned. Text identical to what is already shown is skipped, and longer
+texts such as the progress report are compared line by line so only the
+changed run of lines is deleted and reinserted.
+
+Positions are line based ('3.0', '3.end'), never character offsets:
+characters outside the BMP, like the report's emoji, are counted
+differently by Python and by Tcl.
+"""
+
+# Texts with fewer lines than this are simply replaced
+DIFF_MIN_LINES = 8
+
+
+class TextUpdates:
+    """Per-widget queue of pending text, flushed once per idle period"""
+
+    def __init__(self, root):
+        self.root = root
+        self._shown = {}
+        self._pending = {}
+        self._scheduled = None
+
+    def set(self, widget, text):
+        """Show `text` in a disabled Text widget at the next idle moment"""
+        self._pending[widget] = text
+        if self._scheduled is None:
+            self._scheduled = self.root.after_idle(self.flush)
+
+    def flush(self):
+        """Apply pending writes now"""
+        if self._scheduled is not None:
+            self.root.after_cancel(self._scheduled)
+            self._scheduled = None
+        pending, self._pending = self._pending, {}
+        for widget, text in pending.items():
+            # Widgets start out empty
+            old = self._shown.get(widget, '')
+            if old == text:
+                continue
+            self._shown[widget] = text
+            widget.config(state='normal')
+            if not old or text.count('\n') < DIFF_MIN_LINES:
+                widget.delete('1.0', 'end')
+                widget.insert('1.0', text)
+            else:
+                replace_lines(widget, old.split('\n'), text.split('\n'))
+            widget.config(state='disabled')
+
+
+def replace_lines(widget, old, new):
+    """Turn a widget showing lines `old` into lines `new`, touching only what differs"""
+    shortest = min(len(old), len(new))
+    start = 0
+    while start < shortest and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    middle = new[start:len(new) - end]
+
+    if end:
+        # Whole lines, each with its newline, between two unchanged runs
+        widget.delete(f'{start + 1}.0', f'{len(old) - end + 1}.0')
+        widget.insert(f'{start + 1}.0', ''.join(line + '\n' for line in middle))
+    elif start:
+        # The tail changed: cut from the end of the last unchanged line
+        widget.delete(f'{start}.end', 'end')
+        widget.insert(f'{start}.end', ''.join('\n' + line for line in middle))
+    else:
+        widget.delete('1.0', 'end')
+        widget.insert('1.0', '\n'.join(middle))
@@ -0,0 +1,203 @@
+"""Headless worksheet export with answer keys.
+
+Worksheets are built from the same generators, statements and worked
+solutions as the tutor and streamed straight to CSV, JSONL, paginated plain
+text or printable HTML. Problem j of worksheet w is problem
+w * per_sheet + j of a seeded its_streams set, so any worksheet can be
+regenerated on its own and the output is identical however the work is
+split. Sheets are rendered in chunks, optionally on a process pool with a
+bounded number of chunks in flight, and written as they complete, so memory
+stays flat for runs of hundreds of thousands of worksheets.
+
+    python its_worksheets.py --sheets 200000 --per-sheet 10 --difficulty intermediate \\
+        --topics triangle,circle,quadratic --format html -o worksheets.html -j 8
+"""
+import argparse
+import csv
+import html
+import io
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+
+from its_engine import (DIFFICULTIES, SHAPES, algebra_explanation, geometry_explanation,
+                        problem_code_at, problem_from_code, problem_text)
+
+TOPICS = SHAPES + ['quadratic']
+FORMATS = ['csv', 'jsonl', 'txt', 'html']
+SHEETS_PER_CHUNK = 200
+
+CSV_FIELDS = ['worksheet', 'number', 'topic', 'difficulty', 'statement', 'answer', 'explanation']
+
+HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Worksheets</title>
+<style>
+body { font-family: Arial, sans-serif; }
+section { page-break-after: always; }
+pre { font-family: inherit; white-space: pre-wrap; }
+.problem { margin-bottom: 2em; }
+</style>
+</head>
+<body>
+"""
+HTML_TAIL = "</body>\n</html>\n"
+
+
+class WorksheetSpec:
+    """What to put on every worksheet of a run"""
+
+    def __init__(self, seed, topics, difficulty, per_sheet=10):
+        self.seed = seed
+        self.topics = list(topics)
+        self.difficulty = difficulty
+        self.per_sheet = per_sheet
+
+    def items(self, sheet):
+        """Yield a dict per problem on worksheet `sheet` (0-based)"""
+        for number in range(self.per_sheet):
+            topic = self.topics[number % len(self.topics)]
+            index = sheet * self.per_sheet + number
+            problem, answer = problem_from_code(
+                problem_code_at(self.seed, index, topic, self.difficulty))
+            if topic == 'quadratic':
+                explanation = algebra_explanation(problem)
+            else:
+                explanation = geometry_explanation(problem, answer)
+            yield {'worksheet': sheet + 1, 'number': number + 1, 'topic': topic,
+                   'difficulty': self.difficulty, 'statement': problem_text(problem).strip(),
+                   'answer': answer, 'explanation': explanation}
+
+
+def _number(value):
+    # Answers are rounded to 2dp; drop trailing zeros so 44.0 prints as 44
+    return f'{value:.2f}'.rstrip('0').rstrip('.')
+
+
+def format_answer(answer):
+    if answer is None:
+        return "No real solutions"
+    if isinstance(answer, list):
+        return ', '.join(map(_number, answer))
+    return _number(answer)
+
+
+def format_csv(items):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, CSV_FIELDS, lineterminator='\n')
+    for item in items:
+        writer.writerow(dict(item, answer=format_answer(item['answer'])))
+    return buffer.getvalue()
+
+
+def format_jsonl(items):
+    return ''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in items)
+
+
+def format_txt(items):
+    # One page per worksheet and one for its answer key, separated by form feeds
+    items = list(items)
+    first = items[0]
+    title = f"Worksheet {first['worksheet']} ({first['difficulty']})"
+    page = [title, '=' * len(title), '']
+    key = [f"{title} - Answer key", '=' * (len(title) + 13), '']
+    for item in items:
+        page += [f"{item['number']}.", item['statement'], '']
+        key += [f"{item['number']}. {format_answer(item['answer'])}", item['explanation'], '']
+    return '\n'.join(page) + '\f\n' + '\n'.join(key) + '\f\n'
+
+
+def format_html(items):
+    items = list(items)
+    first = items[0]
+    title = html.escape(f"Worksheet {first['worksheet']} ({first['difficulty']})")
+    page = [f"<section><h1>{title}</h1>"]
+    key = [f"<section><h1>{title} &ndash; Answer key</h1>"]
+    for item in items:
+        page.append(f"<div class=\"problem\"><h3>{item['number']}.</h3>"
+                    f"<pre>{html.escape(item['statement'])}</pre></div>")
+        key.append(f"<div class=\"problem\"><h3>{item['number']}. "
+                   f"{html.escape(format_answer(item['answer']))}</h3>"
+                   f"<pre>{html.escape(item['explanation'])}</pre></div>")
+    return '\n'.join(page) + '</section>\n' + '\n'.join(key) + '</section>\n'
+
+
+FORMATTERS = {'csv': format_csv, 'jsonl': format_jsonl, 'txt': format_txt, 'html': format_html}
+HEADERS = {'csv': ','.join(CSV_FIELDS) + '\n', 'html': HTML_HEAD}
+FOOTERS = {'html': HTML_TAIL}
+
+
+def render_sheets(spec, fmt, start, stop):
+    """Output text for worksheets start..stop-1"""
+    formatter = FORMATTERS[fmt]
+    return ''.join(formatter(spec.items(sheet)) for sheet in range(start, stop))
+
+
+def iter_chunks(spec, fmt, sheets, jobs=1, sheets_per_chunk=SHEETS_PER_CHUNK):
+    """Yield rendered text for all worksheets in order, chunk by chunk"""
+    ranges = ((start, min(start + sheets_per_chunk, sheets))
+              for start in range(0, sheets, sheets_per_chunk))
+    if jobs <= 1:
+        for start, stop in ranges:
+            yield render_sheets(spec, fmt, start, stop)
+        return
+
+    with multiprocessing.Pool(jobs) as pool:
+        # Bounded window: at most 2 chunks per worker are rendered ahead of the writer
+        pending = deque()
+        for start, stop in ranges:
+            pending.append(pool.apply_async(render_sheets, (spec, fmt, start, stop)))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def export(spec, fmt, sheets, out, jobs=1, sheets_per_chunk=SHEETS_PER_CHUNK):
+    """Write `sheets` worksheets to the open text file `out`"""
+    out.write(HEADERS.get(fmt, ''))
+    for text in iter_chunks(spec, fmt, sheets, jobs, sheets_per_chunk):
+        out.write(text)
+    out.write(FOOTERS.get(fmt, ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export worksheets with answer keys")
+    parser.add_argument('--sheets', type=int, default=1)
+    parser.add_argument('--per-sheet', type=int, default=10)
+    parser.add_argument('--topics', default=','.join(TOPICS),
+                        help=f"Comma-separated, from {', '.join(TOPICS)}")
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, default='beginner')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=FORMATS,
+                        help="Output format (default: from the --output extension, else txt)")
+    parser.add_argument('-o', '--output', help="Output file (default: stdout)")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="Worker processes")
+    args = parser.parse_args()
+
+    topics = [topic.strip() for topic in args.topics.split(',') if topic.strip()]
+    unknown = [topic for topic in topics if topic not in TOPICS]
+    if unknown or not topics:
+        parser.error(f"topics must be from {', '.join(TOPICS)}")
+    if args.per_sheet < 1:
+        parser.error("--per-sheet must be at least 1")
+    fmt = args.format
+    if fmt is None:
+        extension = os.path.splitext(args.output or '')[1].lstrip('.').lower()
+        fmt = extension if extension in FORMATS else 'txt'
+
+    spec = WorksheetSpec(args.seed, topics, args.difficulty, args.per_sheet)
+    out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        export(spec, fmt, args.sheets, out, args.jobs)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import random
+from collections import defaultdict
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from its_analytics import analyse_chunks, analyse_columns, analyse_store, encode_rows, export_columns
+from its_engine import DIFFICULTIES, SHAPES, TOPICS
+from its_store import ProgressStore
+
+
+def attempt_rows(count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        topic = rng.choice(TOPICS)
+        subject = 'algebra' if topic == 'quadratic_equations' else 'geometry'
+        rows.append((f's{rng.randrange(40)}', 1000.0 + i, subject, topic,
+                     rng.choice(DIFFICULTIES), int(rng.random() < 0.6)))
+    return rows
+
+
+def naive(rows, mastery_correct):
+    """Per (student, topic) counters recomputed attempt by attempt"""
+    groups = defaultdict(lambda: {'correct': 0, 'total': 0, 'first': None, 'mastered': None})
+    for student, ts, _subject, topic, _difficulty, correct in rows:
+        group = groups[student, topic]
+        group['total'] += 1
+        group['correct'] += correct
+        if group['first'] is None:
+            group['first'] = ts
+        if correct and group['correct'] == mastery_correct:
+            group['mastered'] = (ts - group['first'], group['total'])
+    return groups
+
+
+@pytest.mark.parametrize('chunk_size', [1, 37, 5000])
+def test_streamed_counts_match_a_naive_recount(chunk_size):
+    rows = attempt_rows(3000)
+    students = {}
+    chunks = (encode_rows(rows[i:i + chunk_size], students)
+              for i in range(0, len(rows), chunk_size))
+    stats = analyse_chunks(chunks, mastery_correct=5)
+    groups = naive(rows, 5)
+
+    assert stats.attempts == len(rows)
+    for (student, topic), group in groups.items():
+        s, t = students[student], TOPICS.index(topic)
+        assert (stats.correct[s, t], stats.total[s, t]) == (group['correct'], group['total'])
+        assert stats.first_ts[s, t] == group['first']
+        if group['mastered'] is None:
+            assert np.isnan(stats.mastered_ts[s, t])
+        else:
+            seconds, attempts = group['mastered']
+            assert stats.mastered_ts[s, t] - stats.first_ts[s, t] == seconds
+            assert stats.mastered_attempts[s, t] == attempts
+
+    rates = stats.topic_success_rates()
+    for topic in TOPICS:
+        correct = sum(r[5] for r in rows if r[3] == topic)
+        total = sum(1 for r in rows if r[3] == topic)
+        assert rates[topic] == {'attempts': total, 'correct': correct,
+                                'rate': pytest.approx(correct / total)}
+        assert stats.difficulty_distribution()[topic] == {
+            d: sum(1 for r in rows if r[3] == topic and r[4] == d) for d in DIFFICULTIES}
+
+    weakest = dict.fromkeys(SHAPES, 0)
+    for student in students:
+        shape_rates = [(groups[student, shape]['correct'] / groups[student, shape]['total'], i)
+                       for i, shape in enumerate(SHAPES)
+                       if groups[student, shape]['total'] >= 3]
+        if shape_rates:
+            weakest[SHAPES[min(shape_rates)[1]]] += 1
+    assert stats.weakest_shapes() == weakest
+
+
+def test_store_and_exported_columns_agree(tmp_path):
+    store = ProgressStore(str(tmp_path / 'progress.db'))
+    try:
+        for student, _ts, subject, topic, difficulty, correct in attempt_rows(500, seed=1):
+            store.record_attempt(student, subject, topic, difficulty, correct)
+        store.flush()
+        from_store, students = analyse_store(store, chunk_size=64)
+        assert export_columns(store, str(tmp_path / 'columns'), chunk_size=100) == 500
+    finally:
+        store.close()
+    from_columns, exported = analyse_columns(str(tmp_path / 'columns'), chunk_size=77)
+    assert exported == students
+    assert from_columns.report() == from_store.report()
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from its_engine import DIFFICULTIES, grade_algebra, quadratic_catalogue, solve_quadratic
+
+np = pytest.importorskip('numpy')
+
+from its_batch import (catalogue_arrays, check_quadratic_batch, pack_solutions,  # noqa: E402
+                       solve_quadratic_batch)
+
+
+def assert_same_roots(a, b, c):
+    """solve_quadratic_batch agrees with solve_quadratic on every row"""
+    roots, root_count, real = solve_quadratic_batch(np.array(a), np.array(b), np.array(c))
+    expected, expected_count = pack_solutions([solve_quadratic(*abc) for abc in zip(a, b, c)])
+    assert root_count.tolist() == expected_count.tolist()
+    assert real.tolist() == [count > 0 for count in expected_count]
+    np.testing.assert_array_equal(roots, expected)
+
+
+@pytest.mark.parametrize('difficulty', DIFFICULTIES)
+def test_batch_solver_matches_every_catalogue_entry(difficulty):
+    a, b, c, roots, root_count = catalogue_arrays(difficulty)
+    assert len(a) == len(quadratic_catalogue(difficulty))
+    assert_same_roots(a.tolist(), b.tolist(), c.tolist())
+    if difficulty != 'beginner':
+        # Beginner keys list a repeated root twice, as both roots were drawn
+        batch_roots, batch_count, _ = solve_quadratic_batch(a, b, c)
+        np.testing.assert_array_equal(batch_roots, roots)
+        assert batch_count.tolist() == root_count.tolist()
+
+
+def test_batch_solver_matches_random_coefficients():
+    rng = random.Random(0)
+    a = [rng.choice([-1, 1]) * rng.randint(1, 20) for _ in range(5000)]
+    b = [rng.randint(-60, 60) for _ in range(5000)]
+    c = [rng.randint(-60, 60) for _ in range(5000)]
+    assert_same_roots(a, b, c)
+
+
+@pytest.mark.parametrize('a, b, c', [
+    ([1, 2, -3, 4, 1], [0, 0, 0, 0, 0], [-4, 8, 12, 0, 5]),          # b = 0
+    ([1, 1, 4, 9, -2], [2, -6, 4, 6, 4], [1, 9, 1, 1, -2]),           # D = 0
+    ([1, 2, 5, -1, 3], [1, 1, 0, 2, -4], [1, 3, 1, -5, 2]),           # D < 0
+])
+def test_batch_solver_matches_edge_cases(a, b, c):
+    assert_same_roots(a, b, c)
+
+
+def test_batch_checker_matches_grade_algebra():
+    rng = random.Random(1)
+    a, b, c, roots, root_count = catalogue_arrays('intermediate')
+    keys = [solve_quadratic(*abc) for abc in zip(a.tolist(), b.tolist(), c.tolist())]
+    texts = []
+    for key in keys:
+        choice = rng.randrange(5)
+        if choice == 0:
+            answer = list(key)
+        elif choice == 1:
+            answer = list(reversed(key))
+        elif choice == 2:
+            answer = [x + rng.choice([-0.01, 0.01]) for x in key]
+        elif choice == 3:
+            answer = key[:1]
+        else:
+            answer = key + [rng.randint(-5, 5)]
+        texts.append(', '.join(str(x) for x in answer))
+
+    submitted, submitted_count = pack_solutions([grade_algebra(text, key)[0] for text, key
+                                                 in zip(texts, keys)])
+    expected = [grade_algebra(text, key)[1] for text, key in zip(texts, keys)]
+    assert check_quadratic_batch(submitted, submitted_count, roots, root_count).tolist() == expected
+    assert 0 < sum(expected) < len(expected)
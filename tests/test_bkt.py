@@ -0,0 +1,83 @@
+import json
+import random
+
+import pytest
+
+import its_engine
+from its_engine import BKT_PARAMS, DIFFICULTIES, TutoringEngine, bkt_update
+
+np = pytest.importorskip('numpy')
+
+from its_bkt import build_sequences, fit_bkt, fit_columns, save_params  # noqa: E402
+
+TRUE = {'init': 0.3, 'transit': 0.12, 'slip': 0.1, 'guess': 0.25}
+
+
+def simulate(sequences, steps, params, seed=0):
+    """Attempt columns of learners following BKT with known parameters"""
+    rng = np.random.default_rng(seed)
+    known = rng.random(sequences) < params['init']
+    correct = np.empty((sequences, steps), np.int8)
+    for t in range(steps):
+        p = np.where(known, 1 - params['slip'], params['guess'])
+        correct[:, t] = rng.random(sequences) < p
+        known |= rng.random(sequences) < params['transit']
+    student = np.repeat(np.arange(sequences // len(DIFFICULTIES)), len(DIFFICULTIES))
+    difficulty = np.tile(np.arange(len(DIFFICULTIES)), sequences // len(DIFFICULTIES))
+    # Attempts interleaved across sequences, as in a real log
+    return {'student': np.tile(student, steps).astype(np.int32),
+            'topic': np.zeros(sequences * steps, np.int8),
+            'difficulty': np.tile(difficulty, steps).astype(np.int8),
+            'correct': correct.T.reshape(-1)}
+
+
+def test_em_recovers_known_parameters():
+    columns = simulate(6000, 25, TRUE)
+    obs, mask = build_sequences(columns, 'triangle')
+    assert obs.shape == (6000, 25) and mask.all()
+    # Started well away from the truth
+    fitted = fit_bkt(obs, mask, params=(0.5, 0.3, 0.2, 0.1), max_iter=200)
+    for name, value in TRUE.items():
+        assert fitted[name] == pytest.approx(value, abs=0.03), name
+    assert fitted['attempts'] == 6000 * 25
+
+
+def test_fitted_parameters_load_into_the_engine(tmp_path):
+    fitted = fit_columns(simulate(1500, 20, TRUE, seed=1), max_iter=50)
+    assert list(fitted) == ['triangle']
+    path = tmp_path / 'bkt.json'
+    save_params(str(path), fitted)
+    saved = dict(BKT_PARAMS)
+    try:
+        its_engine.load_bkt_params(str(path))
+        assert BKT_PARAMS['triangle'] == tuple(fitted['triangle'][name]
+                                               for name in its_engine.BKT_FIELDS)
+        assert BKT_PARAMS['circle'] == saved['circle']
+    finally:
+        BKT_PARAMS.update(saved)
+    assert json.loads(path.read_text())['triangle']['sequences'] == 1500
+
+
+def test_bkt_update_is_bayes_then_learning():
+    init, transit, slip, guess = 0.3, 0.1, 0.1, 0.2
+    posterior = 0.3 * 0.9 / (0.3 * 0.9 + 0.7 * 0.2)
+    assert bkt_update(0.3, True, (init, transit, slip, guess)) == pytest.approx(
+        posterior + (1 - posterior) * transit)
+    posterior = 0.3 * 0.1 / (0.3 * 0.1 + 0.7 * 0.8)
+    assert bkt_update(0.3, False, (init, transit, slip, guess)) == pytest.approx(
+        posterior + (1 - posterior) * transit)
+
+
+def test_engine_tracks_each_difficulty_separately():
+    engine = TutoringEngine(rng=random.Random(0))
+    params = BKT_PARAMS['circle']
+    expected = params[0]
+    outcomes = [True, False, True, True, True, True, True]
+    for correct in outcomes:
+        engine.record_attempt('geometry', 'circle', correct, 'beginner')
+        expected = bkt_update(expected, correct, params)
+    assert engine.mastery('circle', 'beginner') == pytest.approx(expected, abs=1e-4)
+    assert engine.mastery('circle', 'intermediate') == pytest.approx(params[0], abs=1e-4)
+    assert engine.mastery('square', 'beginner') == pytest.approx(params[0], abs=1e-4)
+    assert engine.skill_difficulty('circle') == ('intermediate' if expected >= its_engine.MASTERED
+                                                 else 'beginner')
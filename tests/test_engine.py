@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from its_engine import NO_PROBLEM_YET, TutoringEngine, format_equation
+
+
+def test_a_fresh_engine_asks_for_a_problem_first():
+    engine = TutoringEngine(rng=random.Random(0))
+    for subject in ('geometry', 'algebra'):
+        result = getattr(engine, f'check_{subject}_answer')('1, 2')
+        assert result == {'valid': False, 'correct': False, 'feedback': NO_PROBLEM_YET}
+    assert engine.get_geometry_hint() == NO_PROBLEM_YET
+    assert engine.get_geometry_explanation() == NO_PROBLEM_YET
+    assert engine.get_algebra_explanation() == NO_PROBLEM_YET
+    assert engine.state.stats.total('geometry') == engine.state.stats.total('algebra') == 0
+
+
+def test_hints_follow_the_current_problem():
+    engine = TutoringEngine(rng=random.Random(0))
+    engine.generate_geometry_problem('square')
+    engine.generate_algebra_problem('beginner')
+    assert 'side' in engine.get_geometry_hint()
+    assert engine.get_algebra_explanation() != NO_PROBLEM_YET
+
+
+def test_rates_and_snapshots_keep_lifetime_counts_only():
+    engine = TutoringEngine(rng=random.Random(0))
+    engine.record_attempt('geometry', 'circle', True)
+    engine.record_attempt('geometry', 'square', False)
+    assert engine.rates() == (0.5, 0.0)
+    snapshot = engine.progress_snapshot()
+    assert 'recent' not in snapshot['stats']
+
+    # Snapshots saved before the moving averages were dropped still load
+    snapshot['stats']['recent'] = {'geometry': 0.6, 'circle': 1.0}
+    restored = TutoringEngine(rng=random.Random(0))
+    restored.restore_progress(snapshot)
+    assert restored.rates() == (0.5, 0.0)
+    assert restored.state.stats.total('circle') == 1
+
+
+@pytest.mark.parametrize('a, b, c, equation', [
+    (1, -3, 2, "x² - 3x + 2 = 0"),
+    (-1, 4, -5, "-x² + 4x - 5 = 0"),
+    (2, 0, -8, "2x² + 0x - 8 = 0"),
+    (3, -7, 0, "3x² - 7x + 0 = 0"),
+])
+def test_format_equation_folds_signs_and_unit_coefficients(a, b, c, equation):
+    assert format_equation(a, b, c) == equation
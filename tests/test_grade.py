@@ -0,0 +1,75 @@
+import csv
+import json
+
+import pytest
+
+from its_engine import grade_algebra, parse_number
+from its_grade import grade_file, grade_record
+
+
+@pytest.mark.parametrize('text, value', [
+    ('12.5', 12.5), (' 1/2 ', 0.5), ('-3/4', -0.75), ('(1+2)/3', 1.0), ('2*-1.5', -3.0),
+])
+def test_parse_number_accepts_fractions_and_arithmetic(text, value):
+    assert parse_number(text) == pytest.approx(value)
+
+
+@pytest.mark.parametrize('text', [
+    '', 'abc', '1/0', '2**8', "__import__('os')", 'x + 1', '[1]', '(1', '1' * 65 + '+1',
+])
+def test_parse_number_rejects_anything_else(text):
+    with pytest.raises(ValueError):
+        parse_number(text)
+
+
+def test_grade_algebra_matches_roots_as_a_set():
+    assert grade_algebra('3, -2', [-2, 3]) == ([-2.0, 3.0], True)
+    assert grade_algebra('-2', [-2, 3])[1] is False
+
+
+@pytest.mark.parametrize('record, error', [
+    ([1, 2], "Bad record: not a JSON object"),
+    ({'type': 'hexagon', 'answer': '1'}, "Bad problem"),
+    ({'type': 'circle', 'answer': '1'}, "Bad problem"),
+    ({'type': 'circle', 'radius': 'two', 'answer': '1'}, "Bad problem"),
+    ({'problem': [1], 'answer': '1'}, "Bad problem"),
+    ({'type': 'quadratic', 'a': 0, 'b': 1, 'c': 1, 'answer': '1'}, "Bad problem"),
+    ({'type': 'square', 'side': 3, 'answer': 'nine'}, "Bad answer"),
+])
+def test_grade_record_reports_bad_records(record, error):
+    result = grade_record(1, record)
+    assert not result['valid'] and not result['correct']
+    assert result['error'].startswith(error)
+
+
+def test_bad_jsonl_lines_do_not_stop_the_run(tmp_path):
+    source = tmp_path / 'subs.jsonl'
+    source.write_text('\n'.join([
+        json.dumps({'student_id': 's1', 'type': 'square', 'side': 3, 'answer': '9'}),
+        'not json',
+        '[1,2]',
+        json.dumps({'student_id': 's1', 'problem': {'type': 'quadratic', 'a': 1, 'b': -1,
+                                                    'c': -6}, 'answer': '3, -2'}),
+    ]) + '\n', encoding='utf-8')
+    output = tmp_path / 'graded.jsonl'
+
+    summary = grade_file(str(source), str(output), jobs=1)
+    results = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert [r['record'] for r in results] == [1, 2, 3, 4]
+    assert [r['correct'] for r in results] == [True, False, False, True]
+    assert results[1]['error'].startswith("Bad record:")
+    assert summary.report()['s1']['correct'] == 2
+
+
+def test_csv_results_match_across_workers(tmp_path):
+    source = tmp_path / 'subs.csv'
+    with open(source, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['student_id', 'type', 'radius', 'answer'])
+        for i in range(300):
+            writer.writerow([f's{i % 7}', 'circle', i % 9 + 1, '3.14' if i % 2 else 'oops'])
+
+    serial, parallel = tmp_path / 'serial.csv', tmp_path / 'parallel.csv'
+    grade_file(str(source), str(serial), jobs=1, chunk_size=50)
+    grade_file(str(source), str(parallel), jobs=2, chunk_size=50)
+    assert serial.read_text(encoding='utf-8') == parallel.read_text(encoding='utf-8')
@@ -0,0 +1,74 @@
+import json
+import random
+
+import pytest
+
+import its_engine
+from its_engine import draw_problem_code, item_bucket
+
+np = pytest.importorskip('numpy')
+
+from its_irt import build_table, calibrate, fit_2pl  # noqa: E402
+
+
+@pytest.fixture
+def restore_item_table():
+    yield
+    its_engine.ITEM_TARGETS.clear()
+    its_engine.CALIBRATED_REGIONS.clear()
+
+
+def test_fit_2pl_recovers_known_items():
+    rng = np.random.default_rng(0)
+    n_students, n_items = 3000, 12
+    theta = rng.standard_normal(n_students)
+    a = np.linspace(0.6, 2.0, n_items)
+    b = np.linspace(-1.5, 1.5, n_items)[rng.permutation(n_items)]
+    student = np.repeat(np.arange(n_students), n_items)
+    item = np.tile(np.arange(n_items), n_students)
+    tries = np.full(len(student), 4.0)
+    p = 1 / (1 + np.exp(-a[item] * (theta[student] - b[item])))
+    correct = rng.binomial(4, p).astype(float)
+
+    fitted_theta, fitted_a, fitted_b, _, _ = fit_2pl(student, item, tries, correct,
+                                                     n_students, n_items)
+    assert np.abs(fitted_b - b).max() < 0.15
+    assert np.abs(fitted_a - a).max() < 0.25
+    assert np.corrcoef(fitted_theta, theta)[0, 1] > 0.9
+
+
+def test_calibration_orders_buckets_by_difficulty():
+    # Larger circles are harder: P(correct) falls with the radius band
+    rng = random.Random(0)
+    rows = []
+    for student in range(400):
+        ability = rng.gauss(0, 1)
+        for _ in range(20):
+            code = draw_problem_code('circle', rng.choice(its_engine.DIFFICULTIES), rng)
+            band = item_bucket(code)[1][0]
+            p = 1 / (1 + np.exp(-(ability - (band - 2))))
+            rows.append((student, code, rng.random() < p))
+    table, _ = calibrate(rows, min_attempts=30)
+    circle = table['families']['circle']
+    assert [bucket[0] for bucket in circle['buckets']] == sorted(b[0] for b in circle['buckets'])
+    assert circle['b'] == sorted(circle['b'])
+
+
+def test_item_table_changes_what_is_drawn(tmp_path, restore_item_table):
+    # Radius bands 0-4 (radius 2-4), 5-9, 10-14 and 15-19 at b = -1, 0, 1, 2
+    table = build_table([('circle', (band,)) for band in range(4)], [1.0] * 4,
+                        [-1.0, 0.0, 1.0, 2.0], [100] * 4)
+    path = tmp_path / 'items.json'
+    path.write_text(json.dumps(table), encoding='utf-8')
+
+    def radii(difficulty):
+        rng = random.Random(0)
+        return {draw_problem_code('circle', difficulty, rng)[2] for _ in range(300)}
+
+    assert radii('beginner') == set(range(2, 9))
+    its_engine.load_item_table(str(path))
+    assert radii('beginner') == set(range(2, 5))
+    assert radii('intermediate') == set(range(5, 10))
+    assert radii('advanced') == set(range(10, 15))
+    # Shapes the table does not cover keep their fixed ranges
+    assert draw_problem_code('square', 'beginner', random.Random(0))[2] in range(3, 11)
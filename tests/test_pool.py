@@ -0,0 +1,48 @@
+import json
+import random
+import time
+
+import pytest
+
+import its_engine
+from its_pool import ProblemPool
+
+
+@pytest.fixture
+def pool():
+    pool = ProblemPool(low_watermark=4, high_watermark=8, rng=random.Random(0))
+    yield pool
+    pool.close()
+    its_engine.ITEM_TARGETS.clear()
+    its_engine.CALIBRATED_REGIONS.clear()
+
+
+def wait_full(pool, topic, difficulty):
+    deadline = time.monotonic() + 5
+    while pool.size(topic, difficulty) < pool.high_watermark:
+        assert time.monotonic() < deadline, "pool was not refilled"
+        time.sleep(0.01)
+
+
+def test_loading_an_item_table_drops_queued_codes(pool, tmp_path):
+    wait_full(pool, 'circle', 'beginner')
+    assert {pool.get('circle', 'beginner')[2] for _ in range(4)} <= set(range(2, 9))
+
+    # Only radius band 2 (10-14) is calibrated, so every level draws from it
+    path = tmp_path / 'items.json'
+    path.write_text(json.dumps({'bucket_width': its_engine.GEOMETRY_BUCKET_WIDTH,
+                                'families': {'circle': {'buckets': [[2]], 'a': [1.0],
+                                                        'b': [0.0], 'attempts': [100]}}}),
+                    encoding='utf-8')
+    its_engine.load_item_table(str(path))
+    assert pool.get('circle', 'beginner')[2] in range(10, 15)
+    wait_full(pool, 'circle', 'beginner')
+    assert all(pool.get('circle', 'beginner')[2] in range(10, 15) for _ in range(8))
+
+
+def test_misses_do_not_draw_from_the_worker_rng(pool):
+    pool.close()
+    state = pool.rng.getstate()
+    pool._queues['square', 'advanced'].clear()
+    pool.get('square', 'advanced')
+    assert pool.misses == 1 and pool.rng.getstate() == state
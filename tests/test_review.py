@@ -0,0 +1,68 @@
+import math
+import random
+
+from its_engine import REVIEW_FIRST, REVIEW_GROWTH, REVIEW_LAST, StudentState, TutoringEngine
+from its_review import ReviewQueue
+
+
+def test_reviews_grow_until_they_leave_the_schedule():
+    state = StudentState()
+    assert state.schedule_review('circle', True, 0.0) == 0.0
+    now = 100.0
+    due = state.schedule_review('circle', False, now)
+    assert due == now + REVIEW_FIRST and state.reviews_due(due - 1) == []
+    # A correct answer before the review is due leaves it where it is
+    assert state.schedule_review('circle', True, due - 1) == due
+
+    interval = REVIEW_FIRST
+    while True:
+        now = due
+        due = state.schedule_review('circle', True, now)
+        interval *= REVIEW_GROWTH
+        if interval > REVIEW_LAST:
+            break
+        # Due times are whole seconds, never early
+        assert due == math.ceil(now + interval)
+    assert due == 0.0 and state.next_review == 0.0
+
+
+def test_due_topics_come_most_overdue_first():
+    clock = [0.0]
+    engine = TutoringEngine(rng=random.Random(0), clock=lambda: clock[0])
+    engine.record_attempt('geometry', 'square', False)
+    clock[0] = 50.0
+    engine.record_attempt('algebra', 'quadratic_equations', False)
+    clock[0] = 60.0
+    engine.record_attempt('geometry', 'circle', False)
+    clock[0] = REVIEW_FIRST + 60
+    assert engine.due_reviews() == ['square', 'quadratic_equations', 'circle']
+    assert engine.due_review('algebra') == 'quadratic_equations'
+    assert engine.generate_geometry_problem()['problem']['type'] == 'square'
+
+
+def test_queue_orders_students_and_drops_stale_entries():
+    queue = ReviewQueue([('a', 'circle', 30.0), ('b', 'square', 10.0), ('c', 'circle', 0.0)])
+    assert len(queue) == 2 and queue.peek() == (10.0, 'b', 'square')
+    queue.schedule('b', 'square', 50.0)
+    queue.schedule('a', 'triangle', 20.0)
+    assert queue.due(now=40.0) == [(20.0, 'a', 'triangle'), (30.0, 'a', 'circle')]
+    assert queue.due(limit=1, now=40.0) == [(20.0, 'a', 'triangle')]
+    queue.schedule('a', 'triangle', 0.0)
+    queue.schedule('a', 'circle', 0.0)
+    assert queue.due(now=25.0) == []
+    assert queue.due(now=60.0) == [(50.0, 'b', 'square')] and len(queue) == 1
+
+
+def test_queue_follows_engine_schedules():
+    clock = [0.0]
+    queue = ReviewQueue()
+    engine = TutoringEngine(rng=random.Random(0), student_id='s', reviews=queue,
+                            clock=lambda: clock[0])
+    engine.record_attempt('geometry', 'triangle', False)
+    assert queue.peek() == (REVIEW_FIRST, 's', 'triangle')
+    clock[0] = REVIEW_FIRST
+    engine.record_attempt('geometry', 'triangle', True)
+    assert queue.peek() == (REVIEW_FIRST * (1 + REVIEW_GROWTH), 's', 'triangle')
+    fresh = ReviewQueue()
+    fresh.schedule_state('s', engine.state)
+    assert fresh.peek() == queue.peek()
@@ -0,0 +1,59 @@
+import json
+import random
+
+import pytest
+
+import its_engine
+from its_engine import TutoringEngine, draw_region, seen_bit, seen_region
+
+
+@pytest.fixture
+def item_table(tmp_path):
+    # Triangles with base 15-19 and height 10-14 are the only bucket near every target
+    path = tmp_path / 'items.json'
+    path.write_text(json.dumps({'bucket_width': its_engine.GEOMETRY_BUCKET_WIDTH, 'families': {
+        'triangle': {'b': [0.0], 'buckets': [[3, 2]]}}}), encoding='utf-8')
+    its_engine.load_item_table(str(path))
+    yield
+    its_engine.ITEM_TARGETS.clear()
+    its_engine.CALIBRATED_REGIONS.clear()
+
+
+def serve(engine, topic, count):
+    codes = []
+    for _ in range(count):
+        if topic == 'quadratic':
+            engine.generate_algebra_problem('beginner')
+            codes.append(engine.state.algebra)
+        else:
+            engine.generate_geometry_problem(topic)
+            codes.append(engine.state.geometry)
+    return codes
+
+
+@pytest.mark.parametrize('topic', ['square', 'triangle', 'quadratic'])
+def test_no_problem_repeats_within_a_round(topic):
+    engine = TutoringEngine(rng=random.Random(0))
+    region = seen_region(topic, 'beginner')
+    codes = serve(engine, topic, len(region))
+    assert sorted(seen_bit(code) for code in codes) == list(region)
+    # The next round starts over the same problems
+    assert seen_bit(serve(engine, topic, 1)[0]) in region
+
+
+def test_seen_problems_survive_a_snapshot():
+    engine = TutoringEngine(rng=random.Random(0))
+    first = serve(engine, 'square', 4)
+    restored = TutoringEngine(rng=random.Random(0))
+    restored.restore_progress(json.loads(json.dumps(engine.progress_snapshot())))
+    rest = serve(restored, 'square', len(seen_region('square', 'beginner')) - 4)
+    assert not set(first) & set(rest)
+
+
+def test_calibrated_band_is_kept_after_it_runs_out(item_table):
+    region = draw_region('triangle', 'beginner')
+    assert len(region) == 25
+    engine = TutoringEngine(rng=random.Random(0))
+    codes = serve(engine, 'triangle', 3 * len(region))
+    assert all(15 <= base <= 19 and 10 <= height <= 14 for _, _, base, height in codes)
+    assert len(set(codes[:len(region)])) == len(region)
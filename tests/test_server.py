@@ -0,0 +1,106 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from its_server import TutoringServer
+from its_sessions import SessionManager
+from its_store import ProgressStore
+
+
+async def request(port, method, target, body=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b''
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode('latin-1') + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(payload)
+
+
+def run_server(manager, calls):
+    """Start a server on a free localhost port and run `calls(port)` against it"""
+    async def main():
+        server = TutoringServer(manager)
+        await server.start('127.0.0.1', 0)
+        try:
+            return await calls(server._server.sockets[0].getsockname()[1])
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_problem_answer_hint_and_progress():
+    manager = SessionManager(rng=random.Random(0))
+
+    async def calls(port):
+        status, problem = await request(port, 'POST', '/sessions/a/problem',
+                                        {'subject': 'geometry', 'shape': 'square'})
+        assert status == 200 and problem['problem']['type'] == 'square'
+        side = problem['problem']['side']
+        status, hint = await request(port, 'GET', '/sessions/a/hint?subject=geometry')
+        assert status == 200 and 'side' in hint['hint']
+        status, result = await request(port, 'POST', '/sessions/a/answer?subject=geometry',
+                                       {'answer': str(side * side + 1)})
+        assert status == 200 and result['valid'] and not result['correct']
+
+        status, problem = await request(port, 'POST', '/sessions/a/problem',
+                                        {'subject': 'algebra', 'difficulty': 'beginner'})
+        roots = manager.session('a').current('algebra')[1]
+        status, result = await request(port, 'POST', '/sessions/a/answer',
+                                       {'subject': 'algebra',
+                                        'answer': ', '.join(map(str, roots))})
+        assert status == 200 and result['correct']
+
+        status, progress = await request(port, 'GET', '/sessions/a/progress')
+        assert status == 200
+        assert progress['progress']['geometry'] == {'correct': 0, 'total': 1,
+                                                    'topics_covered': ['square']}
+        assert 'LEARNING PROGRESS REPORT' in progress['report']
+        status, reviews = await request(port, 'GET', '/reviews?limit=5')
+        assert status == 200 and reviews == {'reviews': []}
+
+    run_server(manager, calls)
+
+
+@pytest.mark.parametrize('method, target, body, status', [
+    ('POST', '/sessions/a/problem?x=1', [1], 400),
+    ('POST', '/sessions/a/problem', b'{not json', 400),
+    ('POST', '/sessions/a/problem', {'subject': 'history'}, 400),
+    ('POST', '/sessions/a/problem', {'subject': 'geometry', 'shape': 'hexagon'}, 400),
+    ('POST', '/sessions/a/problem', {'subject': 'algebra', 'difficulty': 'expert'}, 400),
+    ('POST', '/sessions/a/answer', {'subject': 'geometry', 'answer': '1'}, 400),
+    ('GET', '/sessions/a/hint?subject=algebra', None, 400),
+    ('GET', '/reviews?limit=ten', None, 400),
+    ('GET', '/sessions/a/problem', None, 405),
+    ('POST', '/reviews', None, 405),
+    ('GET', '/sessions/a/unknown', None, 404),
+    ('GET', '/nowhere', None, 404),
+])
+def test_bad_requests_get_client_errors(method, target, body, status):
+    async def calls(port):
+        return await request(port, method, target, body)
+
+    got, payload = run_server(SessionManager(rng=random.Random(0)), calls)
+    assert got == status and payload['error']
+
+
+def test_evicted_students_are_rehydrated_from_the_store(tmp_path):
+    store = ProgressStore(str(tmp_path / 'progress.db'))
+    manager = SessionManager(store, rng=random.Random(0))
+
+    async def calls(port):
+        await request(port, 'POST', '/sessions/a/problem', {'subject': 'geometry'})
+        await request(port, 'POST', '/sessions/a/answer', {'subject': 'geometry', 'answer': '0'})
+        manager.evict_idle(-1)
+        assert 'a' not in manager
+        return await request(port, 'GET', '/sessions/a/progress')
+
+    try:
+        status, progress = run_server(manager, calls)
+    finally:
+        store.close()
+    assert status == 200 and progress['progress']['geometry']['total'] == 1
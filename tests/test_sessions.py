@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+from its_engine import TutoringEngine
+from its_sessions import SessionManager
+from its_store import ProgressStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    # A long flush interval keeps snapshots queued while the test runs
+    store = ProgressStore(str(tmp_path / 'progress.db'), flush_interval=1.0)
+    yield store
+    store.close()
+
+
+def answer_circle(engine, correct=True):
+    engine.generate_geometry_problem('circle')
+    answer = engine.current('geometry')[1]
+    return engine.check_geometry_answer(str(answer if correct else answer + 1))
+
+
+def test_evicted_student_rehydrates_before_the_write(store):
+    manager = SessionManager(store, capacity=1, rng=random.Random(0))
+    answer_circle(manager.session('a'))
+    manager.session('b')
+    assert 'a' not in manager
+
+    engine = manager.session('a')
+    assert engine.state.stats.total('geometry') == 1
+    answer_circle(engine)
+    manager.close()
+    store.flush()
+    assert store.load_progress('a')['geometry']['total'] == 2
+
+
+def test_evict_idle_then_rehydrate_keeps_mastery(store):
+    manager = SessionManager(store, rng=random.Random(0))
+    engine = manager.session('a')
+    for _ in range(3):
+        answer_circle(engine)
+    mastery = engine.mastery('circle', 'beginner')
+    assert manager.evict_idle(-1) == 1
+
+    engine = manager.session('a')
+    assert engine.mastery('circle', 'beginner') == pytest.approx(mastery, abs=1e-4)
+    assert engine.state.stats.total('geometry') == 3
+
+
+def test_store_reads_written_snapshots(store):
+    engine = TutoringEngine(rng=random.Random(0), store=store, student_id='a')
+    answer_circle(engine, correct=False)
+    store.flush()
+    assert store.load_progress('a')['geometry'] == {'correct': 0, 'total': 1,
+                                                    'topics_covered': ['circle']}
+    assert store.load_progress('nobody') is None
+
+
+def test_reports_are_cached_outside_the_state(store):
+    manager = SessionManager(store, rng=random.Random(0))
+    engine = manager.session('a')
+    answer_circle(engine)
+    report = engine.progress_report()
+    cached = manager.reports.get('a', engine.state, engine.state.stats.version)
+    assert report.endswith(cached) and 'Generated' not in cached
+    assert not hasattr(engine.state, 'report') and len(manager.reports) == 1
+    manager.evict_idle(-1)
+
+    # A rehydrated state renders afresh rather than reusing the old text
+    engine = manager.session('a')
+    answer_circle(engine, correct=False)
+    assert engine.progress_report() != report
+
+
+def test_cached_reports_carry_the_current_time():
+    clock = [1_700_000_000.0]
+    engine = TutoringEngine(rng=random.Random(0), clock=lambda: clock[0])
+    answer_circle(engine)
+    first = engine.progress_report()
+    clock[0] += 90
+    second = engine.progress_report()
+    assert first.split('\n')[1] != second.split('\n')[1]
+    assert first.split('\n')[2:] == second.split('\n')[2:]
+    assert second == engine.render_progress_report()
+
+
+# Bytes per active student, LRU slot included, that a server can plan around
+SESSION_BUDGET = 1024
+
+
+def test_sessions_stay_under_the_memory_budget():
+    manager = SessionManager(rng=random.Random(0))
+    for i in range(200):
+        engine = manager.session(f'student-{i:05d}')
+        for j in range(20):
+            if j % 3:
+                answer_circle(engine, correct=j % 2)
+            else:
+                engine.generate_algebra_problem()
+                engine.check_algebra_answer('1, 2')
+    assert manager.memory_per_session() < SESSION_BUDGET
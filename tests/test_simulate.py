@@ -0,0 +1,33 @@
+import random
+
+from its_engine import TutoringEngine
+from its_simulate import ThresholdPolicy
+
+
+def answer(engine, policy, topic, correct):
+    engine.record_attempt('geometry' if topic != 'quadratic_equations' else 'algebra',
+                          topic, correct)
+    policy.observe(engine, topic, correct)
+
+
+def test_threshold_policy_follows_the_original_rule():
+    engine, policy = TutoringEngine(rng=random.Random(0)), ThresholdPolicy()
+    for _ in range(3):
+        answer(engine, policy, 'quadratic_equations', True)
+    assert policy.level == 0
+    # Geometry 1/0 (counted before the attempt) and algebra 3/3: mean above 0.8
+    answer(engine, policy, 'circle', True)
+    assert policy.level == 1
+    assert policy.difficulty(engine, 'circle') == 'intermediate'
+    assert policy.difficulty(engine, 'quadratic_equations') == 'beginner'
+
+    for _ in range(6):
+        answer(engine, policy, 'quadratic_equations', False)
+    assert policy.level == 1
+    # Geometry 1/1 and algebra 3/9 give 0.67, not below 0.4
+    answer(engine, policy, 'circle', False)
+    assert policy.level == 1
+    answer(engine, policy, 'circle', False)
+    answer(engine, policy, 'circle', False)
+    # Geometry 1/3 and algebra 3/9: 0.33
+    assert policy.level == 0
@@ -0,0 +1,223 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from its_engine import (DIFFICULTIES, GEOMETRY_RANGES, SHAPES, TutoringEngine, algebra_explanation,
+                        format_equation, geometry_explanation, geometry_hint, geometry_problem,
+                        problem_text, quadratic_catalogue)
+
+# The f-strings the original single-file app rendered with, kept verbatim so
+# the templates can be checked against them. Its source was saved with each
+# non-ASCII character cut to one byte; the glyphs are restored here.
+
+
+def legacy_problem(problem):
+    kind = problem['type']
+    if kind == 'triangle':
+        base, height = problem['base'], problem['height']
+        return f""" TRIANGLE AREA PROBLEM
+
+Find the area of a triangle with:
+• Base = {base} units
+• Height = {height} units
+
+Formula: Area = (1/2) × base × height
+
+Remember to substitute the values into the formula and calculate carefully.
+Round your answer to 2 decimal places if necessary.
+        """
+    if kind == 'square':
+        side = problem['side']
+        return f""" SQUARE AREA PROBLEM
+
+Find the area of a square with:
+• Side length = {side} units
+
+Formula: Area = side²
+
+Calculate the area by squaring the side length.
+        """
+    if kind == 'rectangle':
+        length, width = problem['length'], problem['width']
+        return f"""▭ RECTANGLE AREA PROBLEM
+
+Find the area of a rectangle with:
+• Length = {length} units
+• Width = {width} units
+
+Formula: Area = length × width
+
+Multiply the length and width to find the area.
+        """
+    if kind == 'circle':
+        radius = problem['radius']
+        return f""" CIRCLE AREA PROBLEM
+
+Find the area of a circle with:
+• Radius = {radius} units
+
+Formula: Area = π × radius²
+
+Use π ≈ 3.14159 for your calculation.
+Round your answer to 2 decimal places.
+        """
+
+    a, b, c, equation = problem['a'], problem['b'], problem['c'], problem['equation']
+    if problem['difficulty'] == 'beginner':
+        return f""" QUADRATIC EQUATION PROBLEM (Beginner)
+
+Solve the quadratic equation:
+{equation}
+
+This equation can be solved by factoring or using the quadratic formula.
+
+Enter your solutions separated by commas (e.g., 2, -3)
+Order doesn't matter.
+        """
+    if problem['difficulty'] == 'intermediate':
+        return f""" QUADRATIC EQUATION PROBLEM (Intermediate)
+
+Solve the quadratic equation:
+{equation}
+
+Use the quadratic formula: x = (-b ± √(b² - 4ac)) / (2a)
+Where a = {a}, b = {b}, c = {c}
+
+Enter your solutions separated by commas, rounded to 2 decimal places.
+        """
+    return f""" QUADRATIC EQUATION PROBLEM (Advanced)
+
+Solve the quadratic equation:
+{equation}
+
+This may require careful application of the quadratic formula.
+Consider whether the equation can be factored or if you need to use the formula.
+
+Enter your solutions separated by commas, rounded to 2 decimal places.
+        """
+
+
+def legacy_geometry_explanation(problem, current_answer):
+    explanation = "Step-by-step solution:\n"
+
+    if problem['type'] == 'triangle':
+        explanation += f"Area = (1/2) × base × height\n"
+        explanation += f"Area = (1/2) × {problem['base']} × {problem['height']}\n"
+        explanation += f"Area = {current_answer}"
+    elif problem['type'] == 'square':
+        explanation += f"Area = side²\n"
+        explanation += f"Area = {problem['side']}²\n"
+        explanation += f"Area = {current_answer}"
+    elif problem['type'] == 'rectangle':
+        explanation += f"Area = length × width\n"
+        explanation += f"Area = {problem['length']} × {problem['width']}\n"
+        explanation += f"Area = {current_answer}"
+    elif problem['type'] == 'circle':
+        explanation += f"Area = π × radius²\n"
+        explanation += f"Area = π × {problem['radius']}²\n"
+        explanation += f"Area = π × {problem['radius']**2}\n"
+        explanation += f"Area = {current_answer}"
+
+    return explanation
+
+
+def legacy_geometry_hint(problem):
+    if problem['type'] == 'triangle':
+        hint = f" Hint: Use the formula Area = (1/2) × base × height\nSubstitute: base = {problem['base']}, height = {problem['height']}"
+    elif problem['type'] == 'square':
+        hint = f" Hint: Use the formula Area = side²\nSubstitute: side = {problem['side']}"
+    elif problem['type'] == 'rectangle':
+        hint = f" Hint: Use the formula Area = length × width\nSubstitute: length = {problem['length']}, width = {problem['width']}"
+    elif problem['type'] == 'circle':
+        hint = f" Hint: Use the formula Area = π × radius²\nSubstitute: radius = {problem['radius']}, π ≈ 3.14159"
+    return hint
+
+
+def legacy_algebra_explanation(problem):
+    a, b, c = problem['a'], problem['b'], problem['c']
+
+    explanation = f"Step-by-step solution using the quadratic formula:\n\n"
+    explanation += f"Given: {problem['equation']}\n"
+    explanation += f"Where a = {a}, b = {b}, c = {c}\n\n"
+    explanation += f"Quadratic formula: x = (-b ± √(b² - 4ac)) / (2a)\n\n"
+
+    discriminant = b*b - 4*a*c
+    explanation += f"Calculate discriminant: b² - 4ac = {b}² - 4({a})({c}) = {discriminant}\n\n"
+
+    if discriminant > 0:
+        sqrt_disc = math.sqrt(discriminant)
+        explanation += f"x = (-{b} ± √{discriminant}) / (2×{a})\n"
+        explanation += f"x = ({-b} ± {sqrt_disc:.2f}) / {2*a}\n\n"
+
+        x1 = (-b + sqrt_disc) / (2*a)
+        x2 = (-b - sqrt_disc) / (2*a)
+        explanation += f"x₁ = ({-b} + {sqrt_disc:.2f}) / {2*a} = {x1:.2f}\n"
+        explanation += f"x₂ = ({-b} - {sqrt_disc:.2f}) / {2*a} = {x2:.2f}"
+    elif discriminant == 0:
+        x = -b / (2*a)
+        explanation += f"x = -{b} / (2×{a}) = {x:.2f}\n"
+        explanation += "This equation has one repeated solution."
+
+    return explanation
+
+
+def geometry_problems():
+    """Every geometry problem the generators can produce"""
+    for shape in SHAPES:
+        for difficulty in DIFFICULTIES:
+            ranges = GEOMETRY_RANGES[shape][difficulty].values()
+            for dims in itertools.product(*(range(low, high + 1) for low, high in ranges)):
+                yield geometry_problem(shape, difficulty, *dims)
+
+
+def quadratic_problems():
+    """Every catalogue quadratic, plus one without real roots for the steps"""
+    for difficulty in DIFFICULTIES:
+        catalogue = quadratic_catalogue(difficulty)
+        for i in range(len(catalogue)):
+            yield catalogue.entry(i)[0]
+    yield {"type": "quadratic", "difficulty": 'advanced', "a": 2, "b": 1, "c": 3,
+           "equation": format_equation(2, 1, 3)}
+
+
+def test_geometry_text_matches_the_original_f_strings():
+    shapes = set()
+    for problem, answer in geometry_problems():
+        assert problem_text(problem) == legacy_problem(problem)
+        assert geometry_hint(problem) == legacy_geometry_hint(problem)
+        assert geometry_explanation(problem, answer) == legacy_geometry_explanation(problem, answer)
+        shapes.add(problem['type'])
+    assert shapes == set(SHAPES)
+
+
+def test_quadratic_text_matches_the_original_f_strings():
+    kinds = set()
+    for problem in quadratic_problems():
+        assert problem_text(problem) == legacy_problem(problem)
+        assert algebra_explanation(problem) == legacy_algebra_explanation(problem)
+        discriminant = problem['b'] ** 2 - 4 * problem['a'] * problem['c']
+        kinds.add((discriminant > 0) - (discriminant < 0))
+    assert kinds == {-1, 0, 1}
+
+
+@pytest.mark.parametrize('subject', ['geometry', 'algebra'])
+def test_feedback_matches_the_original_f_strings(subject):
+    engine = TutoringEngine(rng=random.Random(0))
+    for i in range(20):
+        if subject == 'geometry':
+            problem = engine.generate_geometry_problem(SHAPES[i % len(SHAPES)])['problem']
+            answer = engine.current('geometry')[1]
+            result = engine.check_geometry_answer(str(answer))
+            expected = (f" Excellent! That's correct!\n\nYour answer: {float(answer)}\n"
+                        f"Correct answer: {answer}\n\n"
+                        + legacy_geometry_explanation(problem, answer))
+        else:
+            problem = engine.generate_algebra_problem()['problem']
+            roots = engine.current('algebra')[1]
+            result = engine.check_algebra_answer(', '.join(map(str, roots)))
+            expected = (f" Excellent! That's correct!\n\nYour solutions: {[float(x) for x in roots]}\n"
+                        f"Correct solutions: {roots}\n\n"
+                        + legacy_algebra_explanation(problem))
+        assert result['feedback'] == expected
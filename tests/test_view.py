@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from its_view import DIFF_MIN_LINES, TextUpdates, replace_lines
+
+
+class StubText:
+    """Just enough of a Tk Text widget: line-based indices over a string"""
+
+    def __init__(self, text=''):
+        self.text = text
+        self.calls = []
+
+    def index(self, position):
+        if position == 'end':
+            return len(self.text)
+        line, column = position.split('.')
+        lines = self.text.split('\n')
+        line = int(line)
+        if line > len(lines):
+            return len(self.text)
+        offset = sum(len(text) + 1 for text in lines[:line - 1])
+        return offset + (len(lines[line - 1]) if column == 'end' else int(column))
+
+    def insert(self, position, text):
+        self.calls.append(('insert', position, text))
+        at = self.index(position)
+        self.text = self.text[:at] + text + self.text[at:]
+
+    def delete(self, first, last):
+        self.calls.append(('delete', first, last))
+        self.text = self.text[:self.index(first)] + self.text[self.index(last):]
+
+    def config(self, **options):
+        self.calls.append(('config', options))
+
+
+class StubRoot:
+    def after_idle(self, callback):
+        return 'after#1'
+
+    def after_cancel(self, identifier):
+        pass
+
+
+LINES = [f"line {i}" for i in range(12)]
+
+
+@pytest.mark.parametrize('new, calls', [
+    # Insert in the middle: nothing before or after it is touched
+    (LINES[:5] + ['new a', 'new b'] + LINES[5:],
+     [('delete', '6.0', '6.0'), ('insert', '6.0', 'new a\nnew b\n')]),
+    # Delete in the middle
+    (LINES[:3] + LINES[7:], [('delete', '4.0', '8.0'), ('insert', '4.0', '')]),
+    # Change the last line only
+    (LINES[:-1] + ['changed'], [('delete', '11.end', 'end'), ('insert', '11.end', '\nchanged')]),
+    # Change the first line only
+    (['changed'] + LINES[1:], [('delete', '1.0', '2.0'), ('insert', '1.0', 'changed\n')]),
+    # Nothing in common
+    ([f"other {i}" for i in range(9)],
+     [('delete', '1.0', 'end'), ('insert', '1.0', '\n'.join(f"other {i}" for i in range(9)))]),
+])
+def test_replace_lines_touches_only_the_changed_run(new, calls):
+    widget = StubText('\n'.join(LINES))
+    replace_lines(widget, LINES, new)
+    assert widget.text == '\n'.join(new)
+    assert widget.calls == calls
+
+
+def test_replace_lines_matches_a_full_replace():
+    rng = random.Random(0)
+    for _ in range(500):
+        old = [rng.choice('abc') for _ in range(rng.randrange(1, 12))]
+        new = [rng.choice('abc') for _ in range(rng.randrange(1, 12))]
+        widget = StubText('\n'.join(old))
+        replace_lines(widget, old, new)
+        assert widget.text == '\n'.join(new), (old, new)
+
+
+def test_updates_are_coalesced_and_identical_text_is_skipped():
+    updates = TextUpdates(StubRoot())
+    widget = StubText()
+    report = '\n'.join(LINES)
+    updates.set(widget, 'first draft')
+    updates.set(widget, report)
+    updates.flush()
+    assert widget.text == report
+    assert [call[0] for call in widget.calls] == ['config', 'delete', 'insert', 'config']
+
+    widget.calls.clear()
+    updates.set(widget, report)
+    updates.flush()
+    assert widget.calls == []
+
+    longer = report.replace('line 6', 'line six')
+    assert longer.count('\n') >= DIFF_MIN_LINES
+    updates.set(widget, longer)
+    updates.flush()
+    assert widget.text == longer
+    assert ('delete', '7.0', '8.0') in widget.calls